@@ -0,0 +1,82 @@
+"""Cold-start benchmark: import-to-ready latency of each agent package.
+
+Every sample runs in a fresh interpreter (like a new Cloud Run instance)
+and times `import <package>.agent` up to the point where `root_agent`
+is available. It also counts the lines the import prints to stdout.
+Packages whose import fails (e.g. they need live credentials) are
+reported with their error:
+
+    python bench_startup.py --runs 5
+    python bench_startup.py vertex_ai_classification ecommerce_agent
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+MARKER = "STARTUP_RESULT "
+
+PROBE = f"""
+import importlib, json, sys, time
+start = time.perf_counter()
+module = importlib.import_module(sys.argv[1] + ".agent")
+module.root_agent
+print({MARKER!r} + json.dumps({{"ready_s": time.perf_counter() - start}}))
+"""
+
+
+def agent_packages() -> list:
+    return sorted(
+        name for name in os.listdir(ROOT)
+        if os.path.isfile(os.path.join(ROOT, name, "agent.py"))
+    )
+
+
+def probe(package: str, env: dict) -> dict:
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-c", PROBE, package],
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=300,
+    )
+    wall = time.perf_counter() - start
+    lines = proc.stdout.splitlines()
+    results = [line for line in lines if line.startswith(MARKER)]
+    if proc.returncode != 0 or not results:
+        error = (proc.stderr.strip().splitlines() or ["no output"])[-1]
+        return {"error": error[:100]}
+    return {
+        "ready_s": json.loads(results[-1][len(MARKER):])["ready_s"],
+        "process_s": wall,
+        "stdout_lines": len(lines) - len(results),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("packages", nargs="*", help="agent packages to probe (default: all)")
+    parser.add_argument("--runs", type=int, default=3, help="fresh interpreters per package")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    # Placeholders so packages that read these at import time can load without a real project
+    env.setdefault("GOOGLE_CLOUD_PROJECT", "bench-project")
+    env.setdefault("GOOGLE_CLOUD_LOCATION", "us-central1")
+
+    print(f"{'package':<28}{'ready ms':>10}{'process ms':>12}{'stdout lines':>14}")
+    for package in args.packages or agent_packages():
+        samples = [probe(package, env) for _ in range(args.runs)]
+        ok = [s for s in samples if "error" not in s]
+        if not ok:
+            print(f"{package:<28}  failed: {samples[0]['error']}")
+            continue
+        ready = statistics.median(s["ready_s"] for s in ok) * 1000
+        process = statistics.median(s["process_s"] for s in ok) * 1000
+        print(f"{package:<28}{ready:>10.0f}{process:>12.0f}{ok[0]['stdout_lines']:>14}")
+
+
+if __name__ == "__main__":
+    main()
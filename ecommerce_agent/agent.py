@@ -21,31 +21,95 @@ PRODUCT_CATALOG = [
 ]
 
 
+# Import the indexed catalog (support both package and script contexts)
+try:
+    from .catalog import ProductCatalog
+except ImportError:
+    from catalog import ProductCatalog
+
+def load_catalog() -> ProductCatalog:
+    """Build the catalog index from PRODUCT_CATALOG_PATH (.csv or .jsonl), or the sample catalog."""
+    path = os.getenv("PRODUCT_CATALOG_PATH")
+    if not path:
+        return ProductCatalog(PRODUCT_CATALOG)
+    if path.endswith(".csv"):
+        return ProductCatalog.from_csv(path)
+    return ProductCatalog.from_jsonl(path)
+
+CATALOG = load_catalog()
+
+def search_product_catalog_top_k(query: str, k: int = 5) -> list:
+    """Ranked product matches by name (whole or partial words) or category."""
+    return [
+        {"id": p["id"], "name": p["name"], "price": p["price"]}
+        for p in CATALOG.search(query, k)
+    ]
+
 def search_product_catalog(query: str) -> dict:
     """Lookup a product by name or category."""
-    q = query.lower()
-    for p in PRODUCT_CATALOG:
-        if q in p["name"].lower() or q in p["category"].lower():
-            return {"id": p["id"], "name": p["name"], "price": p["price"]}
-    return {}
+    results = search_product_catalog_top_k(query, k=1)
+    return results[0] if results else {}
 
+# Starting stock levels
 INVENTORY_DB = {
     "P1001": 15,
     "P1002": 8,
     "P2001": 0,
 }
 
+# Import the inventory engine and order IDs (support both package and script contexts)
+try:
+    from .inventory import InMemoryInventory, InsufficientStock, SqliteInventory
+    from .order_ids import new_order_id
+except ImportError:
+    from inventory import InMemoryInventory, InsufficientStock, SqliteInventory
+    from order_ids import new_order_id
+
+# Set INVENTORY_DB_PATH to share stock between worker processes through SQLite
+INVENTORY_DB_PATH = os.getenv("INVENTORY_DB_PATH")
+INVENTORY = SqliteInventory(INVENTORY_DB_PATH, INVENTORY_DB) if INVENTORY_DB_PATH else InMemoryInventory(INVENTORY_DB)
+
 def check_stock(product_id: str, quantity: int) -> str:
     """Return 'In Stock' or 'Out of Stock'."""
-    return "In Stock" if INVENTORY_DB.get(product_id, 0) >= quantity else "Out of Stock"
+    return "In Stock" if INVENTORY.available(product_id) >= quantity else "Out of Stock"
 
 import json
 from google.adk.tools import ToolContext
 
+def _claim_stock(product_id: str, quantity: int, tool_context: ToolContext) -> bool:
+    """Commit the hold placed during the stock check, or reserve and commit atomically now."""
+    hold = tool_context.state.get("reservation")
+    if hold:
+        tool_context.state["reservation"] = None
+        if hold["product_id"] == product_id and hold["quantity"] == quantity:
+            if INVENTORY.commit(hold["id"]):
+                return True
+        else:
+            INVENTORY.release(hold["id"])
+    try:
+        INVENTORY.take({product_id: quantity})
+    except InsufficientStock:
+        return False
+    return True
+
 def process_order(product_id: str, quantity: int, tool_context: ToolContext) -> str:
     """Simulate order and return JSON confirmation."""
-    import datetime, random
-    order_id = f"ORD-{datetime.datetime.now().strftime('%Y%m%d')}-{random.randint(1000,9999)}"
+    if quantity <= 0:
+        return json.dumps({
+            "product_id": product_id,
+            "quantity": quantity,
+            "status": "rejected",
+            "reason": "quantity must be positive"
+        })
+    if not _claim_stock(product_id, quantity, tool_context):
+        # Another order took the stock after the check; never oversell
+        return json.dumps({
+            "product_id": product_id,
+            "quantity": quantity,
+            "status": "rejected",
+            "reason": "out of stock"
+        })
+    order_id = new_order_id()
     confirmation = {
         "order_id": order_id,
         "product_id": product_id,
@@ -101,7 +165,138 @@ workflow_agent = SequentialAgent(
     name="EcommerceWorkflow",
     sub_agents=[product_agent, inventory_agent, order_agent]
 )
-root_agent = workflow_agent
+
+import re
+from typing import AsyncGenerator, Optional
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types as genai_types
+
+# Structured order requests, e.g. "buy 2 units of Wireless", "I'd like to order 1 Running Shoes please".
+# Anchored at the start of the message so "I don't want to buy 2 ..." or "cancel my order 1 ..." never match.
+ORDER_REQUEST_PATTERN = re.compile(
+    r"^\s*(?:(?:hi|hello|hey)\b[\s,!.]*)?(?:please\s+)?"
+    r"(?:(?:i\s+(?:would\s+like|'d\s+like|want|wanna|need)\s+to|i'd\s+like\s+to|let\s+me)\s+)?"
+    r"(?:buy|order|purchase)\s+(?P<quantity>\d+)\s+(?:(?:units?|pcs|pieces|x)\s+)?(?:of\s+)?(?:the\s+)?"
+    r"(?P<product>\w[\w\s'().-]*?)\s*(?:,?\s*please)?[.!]*\s*$",
+    re.IGNORECASE,
+)
+# Messages the fast path must leave to the LLM even when the pattern matches
+NEGATION_PATTERN = re.compile(r"\b(?:not|no|never|don't|dont|cancel|refund|return)\b|n't\b", re.IGNORECASE)
+MULTI_ITEM_PATTERN = re.compile(r"\band\b|[,&+;]", re.IGNORECASE)
+
+OUT_OF_STOCK_MESSAGE = "Unable to complete order: item is out of stock."
+# Session state key for a structured {product_query, quantity} order sent by the API
+ORDER_REQUEST_KEY = "order_request"
+
+def parse_order_request(text: str) -> Optional[tuple]:
+    """Return (product_query, quantity) for a single-item order request, or None.
+
+    Questions, negations, multi-item orders and non-positive quantities return None
+    so the LLM workflow interprets them.
+    """
+    text = text or ""
+    if "?" in text or NEGATION_PATTERN.search(text):
+        return None
+    match = ORDER_REQUEST_PATTERN.match(text)
+    if not match:
+        return None
+    product, quantity = match.group("product").strip(), int(match.group("quantity"))
+    if quantity <= 0 or MULTI_ITEM_PATTERN.search(product):
+        return None
+    return product, quantity
+
+def find_exact_product(query: str) -> dict:
+    """The best product whose name matches every word of the query, or {}."""
+    results = CATALOG.search(query, k=1, match_all=True)
+    return {"id": results[0]["id"], "name": results[0]["name"], "price": results[0]["price"]} if results else {}
+
+class FastPathWorkflow(BaseAgent):
+    """Runs the deterministic lookup and stock steps directly when the request is structured.
+
+    For "buy N <product>" requests (or a structured order placed in session state
+    under ORDER_REQUEST_KEY) the catalog search and a stock reservation run as
+    plain function calls and their results go into session state
+    (product_info, stock_status), so the only LLM call is OrderAgent's
+    confirmation; out-of-stock requests need no LLM at all. Anything the
+    parser or an every-word catalog match cannot resolve goes through the
+    full EcommerceWorkflow.
+    """
+
+    def __init__(self, workflow: SequentialAgent, order_agent: LlmAgent):
+        super().__init__(
+            name="EcommerceFastPath",
+            description="Deterministic product lookup and stock check, LLM order confirmation.",
+            sub_agents=[workflow]
+        )
+        # order_agent already belongs to the workflow; it is run directly, not re-parented
+        self._order_agent = order_agent
+
+    def _event(self, ctx: InvocationContext, text: str, state_delta: dict = None) -> Event:
+        return Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=genai_types.Content(role="model", parts=[genai_types.Part(text=text)]),
+            actions=EventActions(state_delta=state_delta or {})
+        )
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        user_text = ""
+        if ctx.user_content and ctx.user_content.parts:
+            user_text = "".join(p.text for p in ctx.user_content.parts if getattr(p, "text", None))
+        # A structured order sent alongside the message applies to this turn only
+        order_request = ctx.session.state.get(ORDER_REQUEST_KEY)
+        if order_request:
+            yield Event(invocation_id=ctx.invocation_id, author=self.name, branch=ctx.branch,
+                        actions=EventActions(state_delta={ORDER_REQUEST_KEY: None}))
+            parsed = (order_request["product_query"], int(order_request["quantity"]))
+        else:
+            parsed = parse_order_request(user_text)
+        product = find_exact_product(parsed[0]) if parsed and parsed[1] > 0 else {}
+
+        if not product:
+            # Free text (or an unknown product): let the LLM pipeline interpret it
+            async for event in self.sub_agents[0].run_async(ctx):
+                yield event
+            return
+
+        quantity = parsed[1]
+        # Hold the stock now so it cannot be sold to someone else before OrderAgent confirms;
+        # process_order commits the hold, and it is released if the order never happens
+        stock_delta = {}
+        try:
+            reservation = INVENTORY.reserve_one(product["id"], quantity)
+            stock_status = "In Stock"
+            stock_delta["reservation"] = {"id": reservation.id, "product_id": product["id"], "quantity": quantity}
+        except InsufficientStock:
+            stock_status = "Out of Stock"
+        stock_delta["stock_status"] = stock_status
+        yield self._event(ctx, json.dumps(product), {"product_info": json.dumps(product), "quantity": quantity})
+        yield self._event(ctx, stock_status, stock_delta)
+
+        if stock_status != "In Stock":
+            yield self._event(ctx, OUT_OF_STOCK_MESSAGE)
+            return
+        released = False
+        try:
+            async for event in self._order_agent.run_async(ctx):
+                yield event
+        finally:
+            # OrderAgent ended (or failed) without process_order claiming the hold: return the
+            # stock now instead of keeping it out of available() until the reservation expires
+            hold = ctx.session.state.get("reservation") or {}
+            if hold.get("id") == reservation.id:
+                released = INVENTORY.release(reservation.id)
+        if released:
+            yield Event(invocation_id=ctx.invocation_id, author=self.name, branch=ctx.branch,
+                        actions=EventActions(state_delta={"reservation": None}))
+
+fast_path_agent = FastPathWorkflow(workflow_agent, order_agent)
+
+# ECOMMERCE_FAST_PATH=0 restores the all-LLM pipeline
+root_agent = fast_path_agent if os.getenv("ECOMMERCE_FAST_PATH", "1") != "0" else workflow_agent
 
 import asyncio
 
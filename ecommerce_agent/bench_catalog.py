@@ -0,0 +1,79 @@
+"""Catalog lookup benchmark: indexed ProductCatalog vs the original linear scan.
+
+Generates synthetic catalogs of 10k, 100k and 1M products and times index
+build plus whole-word, partial-word, category and miss queries:
+
+    python ecommerce_agent/bench_catalog.py --sizes 10000 100000 1000000
+"""
+import argparse
+import random
+import time
+
+from catalog import ProductCatalog
+
+ADJECTIVES = ["Wireless", "Bluetooth", "Ergonomic", "Portable", "Compact", "Premium", "Smart",
+              "Waterproof", "Mechanical", "Gaming", "Running", "Classic", "Ultra", "Slim"]
+NOUNS = ["Mouse", "Keyboard", "Headphones", "Speaker", "Shoes", "Jacket", "Monitor", "Charger",
+         "Backpack", "Watch", "Camera", "Lamp", "Bottle", "Tablet", "Router", "Webcam"]
+CATEGORIES = ["Electronics", "Sportswear", "Home", "Office", "Outdoor", "Accessories"]
+
+QUERIES = {
+    "word": "wireless mouse",
+    "partial": "ergo keyb",
+    "category": "Sportswear",
+    "rare": "model 4242",
+    "miss": "submarine",
+}
+
+
+def make_products(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    for i in range(n):
+        yield {
+            "id": f"P{i:07d}",
+            "name": f"{rng.choice(ADJECTIVES)} {rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} Model {i % 10000}",
+            "category": rng.choice(CATEGORIES),
+            "price": round(rng.uniform(5, 500), 2),
+        }
+
+
+def linear_search(products, query: str) -> dict:
+    """The original search_product_catalog loop."""
+    q = query.lower()
+    for p in products:
+        if q in p["name"].lower() or q in p["category"].lower():
+            return {"id": p["id"], "name": p["name"], "price": p["price"]}
+    return {}
+
+
+def time_ms(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'size':>9}{'build s':>9}  " + "".join(f"{name:>18}" for name in QUERIES))
+    for size in args.sizes:
+        products = list(make_products(size))
+        start = time.perf_counter()
+        catalog = ProductCatalog(products)
+        build = time.perf_counter() - start
+        cells = []
+        for query in QUERIES.values():
+            indexed = time_ms(lambda: catalog.search(query, args.k), args.repeat)
+            linear = time_ms(lambda: linear_search(products, query), max(1, args.repeat // 10))
+            cells.append(f"{indexed:7.2f} / {linear:7.1f}")
+        print(f"{size:>9}{build:>9.1f}  " + "".join(f"{c:>18}" for c in cells))
+    print("cells: indexed top-k ms / linear first-hit ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Concurrency benchmark for the /chat handler with a stub LLM.
+
+Every LlmAgent in the workflow is pointed at a stub model that answers after a
+fixed delay, so the numbers reflect how the service schedules requests rather
+than Gemini latency. Both handlers run the three-agent EcommerceWorkflow (not
+the fast path, whose out-of-stock answers skip the LLM entirely). Compares the
+shared-runner run_async handler with the previous handler (new Runner per
+request, sync runner.run inside async def):
+
+    python ecommerce_agent/bench_concurrency.py --latency 0.2 --requests 64
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+os.environ.setdefault("GOOGLE_CLOUD_PROJECT", "bench-project")
+os.environ.setdefault("GOOGLE_CLOUD_LOCATION", "us-central1")
+
+from google.adk.models import BaseLlm
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import Runner
+from google.genai import types as genai_types
+
+import main
+from agent import workflow_agent
+
+
+class StubLlm(BaseLlm):
+    """Answers every request with fixed text after `latency` seconds."""
+    model: str = "stub-llm"
+    latency: float = 0.2
+    calls: int = 0
+
+    async def generate_content_async(self, llm_request, stream: bool = False):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        yield LlmResponse(
+            content=genai_types.Content(role="model", parts=[genai_types.Part(text="In Stock")])
+        )
+
+
+def use_stub_llm(agent, llm):
+    for sub_agent in getattr(agent, "sub_agents", []):
+        if hasattr(sub_agent, "model"):
+            sub_agent.model = llm
+        use_stub_llm(sub_agent, llm)
+
+
+async def legacy_process_chat(user_input: str, user_id: str, session_id: str):
+    """The handler as it was: a Runner per request and a blocking sync iterator."""
+    await main.session_service.create_session(app_name=main.APP_NAME, user_id=user_id, session_id=session_id)
+    runner = Runner(agent=workflow_agent, app_name=main.APP_NAME, session_service=main.session_service)
+    user_content = genai_types.Content(role="user", parts=[genai_types.Part(text=user_input)])
+    final_answer = ""
+    for event in runner.run(user_id=user_id, session_id=session_id, new_message=user_content):
+        if event.is_final_response() and event.content and event.content.parts:
+            final_answer = "".join(p.text for p in event.content.parts if p.text)
+    return {"response": final_answer}
+
+
+async def run_level(handler, concurrency: int, total: int):
+    """Fire requests in waves of `concurrency`; latency counts from the wave start."""
+    latencies = []
+
+    async def request(i: int, wave_start: float):
+        await handler("I want to buy 2 units of Wireless", f"user{i % concurrency}", f"session{i}")
+        latencies.append(time.perf_counter() - wave_start)
+
+    start = time.perf_counter()
+    for first in range(0, total, concurrency):
+        wave_start = time.perf_counter()
+        await asyncio.gather(*(request(i, wave_start) for i in range(first, min(first + concurrency, total))))
+    wall = time.perf_counter() - start
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return statistics.median(latencies), p99, total / wall
+
+
+async def bench(args):
+    use_stub_llm(workflow_agent, StubLlm(latency=args.latency))
+    # Pin the shared-runner handler to the LLM workflow too
+    main.runner = Runner(agent=workflow_agent, app_name=main.APP_NAME, session_service=main.session_service)
+    handlers = {"run_async": main._process_chat}
+    if not args.skip_legacy:
+        handlers["legacy"] = legacy_process_chat
+    print(f"{'handler':<10}{'clients':>8}{'p50 ms':>10}{'p99 ms':>10}{'req/s':>9}")
+    for name, handler in handlers.items():
+        for concurrency in (1, 16, 64):
+            total = max(args.requests, concurrency)
+            p50, p99, rps = await run_level(handler, concurrency, total)
+            print(f"{name:<10}{concurrency:>8}{p50 * 1000:>10.0f}{p99 * 1000:>10.0f}{rps:>9.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.2, help="stub LLM seconds per call")
+    parser.add_argument("--requests", type=int, default=64, help="requests per concurrency level")
+    parser.add_argument("--skip-legacy", action="store_true")
+    asyncio.run(bench(parser.parse_args()))
@@ -0,0 +1,57 @@
+"""Latency and LLM-call comparison: full EcommerceWorkflow vs the fast path.
+
+Both pipelines run against a stub LLM with a fixed per-call delay, so the
+difference is the number of LLM hops each one makes:
+
+    python ecommerce_agent/bench_fast_path.py --latency 0.5 --runs 10
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types as genai_types
+
+from bench_concurrency import StubLlm, use_stub_llm
+from agent import fast_path_agent, workflow_agent
+
+REQUESTS = {
+    "in stock": "I want to buy 2 units of Wireless",
+    "out of stock": "I want to buy 1 units of Running Shoes",
+    "free text": "Do you have something to type with over bluetooth?",
+}
+
+
+async def time_agent(agent, llm, text: str, runs: int):
+    session_service = InMemorySessionService()
+    runner = Runner(agent=agent, app_name="bench", session_service=session_service)
+    latencies, calls = [], []
+    for i in range(runs):
+        await session_service.create_session(app_name="bench", user_id="u", session_id=f"s{i}")
+        message = genai_types.Content(role="user", parts=[genai_types.Part(text=text)])
+        before = llm.calls
+        start = time.perf_counter()
+        async for _ in runner.run_async(user_id="u", session_id=f"s{i}", new_message=message):
+            pass
+        latencies.append(time.perf_counter() - start)
+        calls.append(llm.calls - before)
+    return statistics.median(latencies), statistics.mean(calls)
+
+
+async def bench(args):
+    llm = StubLlm(latency=args.latency)
+    use_stub_llm(fast_path_agent, llm)
+    print(f"{'request':<14}{'pipeline':<12}{'LLM calls':>10}{'p50 ms':>10}")
+    for label, text in REQUESTS.items():
+        for name, agent in (("workflow", workflow_agent), ("fast path", fast_path_agent)):
+            p50, calls = await time_agent(agent, llm, text, args.runs)
+            print(f"{label:<14}{name:<12}{calls:>10.1f}{p50 * 1000:>10.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.5, help="stub LLM seconds per call")
+    parser.add_argument("--runs", type=int, default=10)
+    asyncio.run(bench(parser.parse_args()))
@@ -0,0 +1,58 @@
+"""Duplicate-work check for /chat retries, with and without an idempotency key.
+
+A client sends an order, times out, and retries: some retries overlap the
+first request, one arrives after it finished. Every agent runs on a stub
+LLM, so the numbers count executions, LLM calls and stock held for the
+order rather than Gemini latency:
+
+    python ecommerce_agent/bench_idempotency.py --latency 0.3 --retries 3
+"""
+import argparse
+import asyncio
+import time
+
+from bench_concurrency import StubLlm, use_stub_llm
+
+import main
+from agent import INVENTORY
+
+ORDER = "I want to buy 1 units of Wireless"
+SKU = "P1001"
+
+
+async def retry_storm(llm, key, retries: int, user_id: str):
+    calls_before, stock_before = llm.calls, INVENTORY.available(SKU)
+    start = time.perf_counter()
+
+    async def send():
+        return await main._process_chat_once(ORDER, user_id, "s1", key)
+
+    # The first request and its overlapping retries, then one retry after it completed
+    results = await asyncio.gather(*(send() for _ in range(retries)))
+    results.append(await send())
+    elapsed = time.perf_counter() - start
+    replayed = sum(1 for _, was_replayed in results if was_replayed)
+    return {
+        "requests": len(results),
+        "executions": len(results) - replayed,
+        "llm_calls": llm.calls - calls_before,
+        "units_held": stock_before - INVENTORY.available(SKU),
+        "ms": round(elapsed * 1000),
+    }
+
+
+async def bench(args):
+    llm = StubLlm(latency=args.latency)
+    use_stub_llm(main.root_agent, llm)
+    print(f"{'':<10}{'requests':>9}{'executions':>11}{'LLM calls':>10}{'units held':>11}{'ms':>7}")
+    for label, key, user_id in (("no key", None, "u1"), ("with key", "order-123", "u2")):
+        r = await retry_storm(llm, key, args.retries, user_id)
+        print(f"{label:<10}{r['requests']:>9}{r['executions']:>11}{r['llm_calls']:>10}{r['units_held']:>11}{r['ms']:>7}")
+    print("store:", main.idempotency_store.stats())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.3, help="stub LLM seconds per call")
+    parser.add_argument("--retries", type=int, default=3, help="overlapping copies of the first request")
+    asyncio.run(bench(parser.parse_args()))
@@ -0,0 +1,84 @@
+"""Oversell stress test and reservation throughput for the inventory stores.
+
+Many threads race to reserve (and mostly commit) single- and multi-line
+orders against a small stock. Afterwards the test checks that no SKU went
+negative and that units sold plus units left equal the starting stock:
+
+    python ecommerce_agent/bench_inventory.py --threads 64 --orders 2000
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+from inventory import InMemoryInventory, InsufficientStock, SqliteInventory
+
+
+def stress(store, initial: dict, threads: int, orders: int, release_ratio: float, seed: int = 0):
+    skus = list(initial)
+    sold = {sku: 0 for sku in skus}
+    sold_lock = threading.Lock()
+    counts = {"ok": 0, "rejected": 0, "released": 0}
+    start_barrier = threading.Barrier(threads)
+
+    def worker(worker_id: int):
+        rng = random.Random(seed + worker_id)
+        start_barrier.wait()
+        for _ in range(orders // threads):
+            lines = {sku: rng.randint(1, 3) for sku in rng.sample(skus, rng.choice((1, 1, 2, 3)))}
+            try:
+                reservation = store.reserve(lines)
+            except InsufficientStock:
+                with sold_lock:
+                    counts["rejected"] += 1
+                continue
+            if rng.random() < release_ratio:
+                store.release(reservation.id)
+                with sold_lock:
+                    counts["released"] += 1
+            elif store.commit(reservation.id):
+                with sold_lock:
+                    counts["ok"] += 1
+                    for sku, q in lines.items():
+                        sold[sku] += q
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    for sku in skus:
+        left = store.available(sku)
+        assert left >= 0, f"{sku} oversold: {left}"
+        assert sold[sku] + left == initial[sku], f"{sku}: sold {sold[sku]} + left {left} != {initial[sku]}"
+    attempts = counts["ok"] + counts["rejected"] + counts["released"]
+    return attempts / elapsed, counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=64)
+    parser.add_argument("--orders", type=int, default=2000)
+    parser.add_argument("--skus", type=int, default=20)
+    parser.add_argument("--stock", type=int, default=100, help="starting units per SKU")
+    parser.add_argument("--release-ratio", type=float, default=0.1)
+    args = parser.parse_args()
+
+    initial = {f"P{i:04d}": args.stock for i in range(args.skus)}
+    with tempfile.TemporaryDirectory() as tmp:
+        stores = {
+            "memory": InMemoryInventory(initial),
+            "sqlite": SqliteInventory(os.path.join(tmp, "inventory.db"), initial),
+        }
+        for name, store in stores.items():
+            rate, counts = stress(store, initial, args.threads, args.orders, args.release_ratio)
+            print(f"{name:<7} {rate:>9.0f} reservations/s  {counts}  no oversell")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Order ID throughput and uniqueness check.
+
+Measures IDs per second for one thread and for several threads sharing the
+generator, then generates millions of IDs across threads and worker
+processes and verifies there are no duplicates and that each thread's IDs
+are strictly increasing:
+
+    python ecommerce_agent/bench_order_ids.py --total 5000000 --processes 4
+"""
+import argparse
+import multiprocessing
+import threading
+import time
+
+from order_ids import new_order_id
+
+
+def ids_per_second(threads: int, per_thread: int) -> float:
+    def work():
+        for _ in range(per_thread):
+            new_order_id()
+
+    pool = [threading.Thread(target=work) for _ in range(threads)]
+    start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return threads * per_thread / (time.perf_counter() - start)
+
+
+def generate(count: int, threads: int = 4) -> list:
+    """IDs from several threads; asserts each thread's sequence is strictly increasing."""
+    results = [None] * threads
+
+    def work(i: int):
+        ids = [new_order_id() for _ in range(count // threads)]
+        assert all(a < b for a, b in zip(ids, ids[1:])), "IDs not monotonic within a thread"
+        results[i] = ids
+
+    pool = [threading.Thread(target=work, args=(i,)) for i in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return [order_id for ids in results for order_id in ids]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--total", type=int, default=2_000_000, help="IDs for the uniqueness check")
+    parser.add_argument("--processes", type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"1 thread:  {ids_per_second(1, 200_000):>10,.0f} IDs/s")
+    print(f"8 threads: {ids_per_second(8, 25_000):>10,.0f} IDs/s")
+
+    start = time.perf_counter()
+    per_process = args.total // args.processes
+    with multiprocessing.Pool(args.processes) as pool:
+        chunks = pool.map(generate, [per_process] * args.processes)
+    all_ids = [order_id for chunk in chunks for order_id in chunk]
+    unique = len(set(all_ids))
+    elapsed = time.perf_counter() - start
+    print(f"{len(all_ids):,} IDs from {args.processes} processes x 4 threads in {elapsed:.1f}s: "
+          f"{len(all_ids) - unique} duplicates")
+    assert unique == len(all_ids)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+import csv
+import heapq
+import json
+import math
+import re
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Weight of a prefix match ("wire" -> "wireless") relative to a whole-token match
+PREFIX_MATCH_WEIGHT = 0.6
+
+
+def tokenize(text: str) -> list:
+    return _TOKEN_RE.findall(text.lower())
+
+
+class ProductCatalog:
+    """Product catalog with prebuilt lookup indexes.
+
+    - an inverted index from name token to product positions
+    - a sorted token vocabulary, so partial words ("wire") resolve by
+      binary search to every token they prefix
+    - a category map for O(1) category lookups
+
+    Products are stored column-wise to keep million-SKU catalogs compact.
+    """
+
+    def __init__(self, products=()):
+        self.ids = []
+        self.names = []
+        self.categories = []
+        self.prices = []
+        self._by_id = {}
+        self._tokens = defaultdict(lambda: array("i"))
+        self._by_category = defaultdict(lambda: array("i"))
+        self._vocabulary = []
+        self._vocabulary_dirty = False
+        self.add_many(products)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, product: dict) -> None:
+        self.add_many([product])
+
+    def add_many(self, products) -> None:
+        for p in products:
+            pos = len(self.ids)
+            self.ids.append(str(p["id"]))
+            self.names.append(p["name"])
+            self.categories.append(p["category"])
+            self.prices.append(float(p["price"]))
+            self._by_id[self.ids[pos]] = pos
+            for token in set(tokenize(p["name"])):
+                if token not in self._tokens:
+                    self._vocabulary_dirty = True
+                self._tokens[token].append(pos)
+            self._by_category[p["category"].lower()].append(pos)
+
+    @classmethod
+    def from_jsonl(cls, path: str) -> "ProductCatalog":
+        """Load products from a JSON Lines file with id, name, category and price fields."""
+        def rows():
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+        return cls(rows())
+
+    @classmethod
+    def from_csv(cls, path: str) -> "ProductCatalog":
+        """Load products from a CSV file with id, name, category and price columns."""
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            return cls(csv.DictReader(f))
+
+    def product(self, pos: int) -> dict:
+        return {"id": self.ids[pos], "name": self.names[pos], "category": self.categories[pos],
+                "price": self.prices[pos]}
+
+    def get(self, product_id: str) -> dict:
+        pos = self._by_id.get(product_id)
+        return self.product(pos) if pos is not None else {}
+
+    def by_category(self, category: str, k: int = None) -> list:
+        """Products in a category (case-insensitive), in catalog order."""
+        positions = self._by_category.get(category.lower(), ())
+        if k is not None:
+            positions = positions[:k]
+        return [self.product(pos) for pos in positions]
+
+    def _prefix_tokens(self, prefix: str) -> list:
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self._tokens)
+            self._vocabulary_dirty = False
+        matches = []
+        i = bisect_left(self._vocabulary, prefix)
+        while i < len(self._vocabulary) and self._vocabulary[i].startswith(prefix):
+            matches.append(self._vocabulary[i])
+            i += 1
+        return matches
+
+    def _matches(self, token: str) -> list:
+        """(posting array, weight) for every vocabulary token the query token matches."""
+        return [
+            (self._tokens[candidate], 1.0 if candidate == token else PREFIX_MATCH_WEIGHT)
+            for candidate in self._prefix_tokens(token)
+        ]
+
+    @staticmethod
+    def _restrict(candidates: set, matches: list) -> dict:
+        """Candidates matched by a query token -> match weight (whole token beats prefix)."""
+        weights = {}
+        for postings, weight in sorted(matches, key=lambda m: -m[1]):
+            if len(candidates) * 16 < len(postings):
+                # Few candidates against a long posting list: binary-search the sorted postings
+                hits = []
+                for pos in candidates:
+                    i = bisect_left(postings, pos)
+                    if i < len(postings) and postings[i] == pos:
+                        hits.append(pos)
+            else:
+                hits = candidates.intersection(postings)
+            for pos in hits:
+                weights.setdefault(pos, weight)
+        return weights
+
+    def search(self, query: str, k: int = 5, match_all: bool = False) -> list:
+        """Ranked top-k products whose name matches every query word (whole or prefix).
+
+        Falls back to products matching any query word, then to a category
+        lookup, mirroring the name-or-category semantics of the original scan.
+        With match_all, there is no fallback: only every-word matches are returned.
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens or k <= 0:
+            return []
+        n = max(len(self.ids), 1)
+        per_token = []
+        for token in tokens:
+            matches = self._matches(token)
+            size = sum(len(postings) for postings, _ in matches)
+            # Rare words say more about the product than common ones
+            per_token.append((matches, math.log(1 + n / (1 + size)), size))
+        per_token.sort(key=lambda t: t[2])
+
+        # Start from the rarest word and keep only positions every other word also matches
+        candidates = set().union(*(postings for postings, _ in per_token[0][0]))
+        for matches, _, _ in per_token[1:]:
+            if not candidates:
+                break
+            candidates = set(self._restrict(candidates, matches))
+        every_word = bool(candidates)
+        if not candidates and match_all:
+            return []
+        if not candidates:
+            candidates = set().union(*(postings for matches, _, _ in per_token for postings, _ in matches))
+        if not candidates:
+            return self.by_category(query.strip(), k)
+
+        query_lower = " ".join(tokens)
+        def name_bonus(pos):
+            name = self.names[pos].lower()
+            return 2.0 if name == query_lower else 1.0 if name.startswith(query_lower) else 0.0
+
+        # Candidates matching every word as a whole token all share the top IDF score, so
+        # they rank by name alone; common-word queries are mostly this tier
+        exact = set()
+        if every_word:
+            exact = candidates
+            for matches, _, _ in per_token:
+                whole = [m for m in matches if m[1] == 1.0]
+                if len(whole) < len(matches):
+                    exact = set(self._restrict(exact, whole)) if whole else set()
+        full_score = sum(idf * 1.0 for _, idf, _ in per_token)
+        def exact_key(pos):
+            # Shorter names are closer matches; catalog order breaks remaining ties
+            return (full_score + name_bonus(pos), -len(self.names[pos]), -pos)
+        ranked = [(exact_key(pos), pos) for pos in heapq.nlargest(k, exact, key=exact_key)]
+
+        rest = candidates - exact if exact else candidates
+        if len(ranked) == k and rest:
+            # The rest miss a whole-word match somewhere, so only a name bonus can lift
+            # them past the k-th exact match; skip scoring the ones without a chance
+            ceiling = full_score - (1 - PREFIX_MATCH_WEIGHT) * min(idf for _, idf, _ in per_token)
+            rest = {pos for pos in rest if ceiling + name_bonus(pos) >= ranked[-1][0][0]}
+        if rest:
+            weights = [(self._restrict(rest, matches), idf) for matches, idf, _ in per_token]
+            def score(pos):
+                s = sum(idf * w.get(pos, 0.0) for w, idf in weights)
+                name = self.names[pos].lower()
+                if name == query_lower:
+                    s += 2.0
+                elif name.startswith(query_lower):
+                    s += 1.0
+                return (s, -len(name), -pos)
+            top = heapq.nlargest(k, rest, key=score)
+            if not ranked:
+                return [self.product(pos) for pos in top]
+            ranked = heapq.nlargest(k, ranked + [(score(pos), pos) for pos in top])
+        return [self.product(pos) for _, pos in ranked]
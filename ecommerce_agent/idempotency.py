@@ -0,0 +1,104 @@
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+
+# Completed results are replayed for this long after the first execution finishes
+DEFAULT_TTL_SECONDS = 24 * 3600
+DEFAULT_MAX_ENTRIES = 100_000
+
+
+class IdempotencyKeyConflict(Exception):
+    """Raised when a key is reused with a different request body."""
+
+    def __init__(self, key: str):
+        super().__init__(f"Idempotency key {key!r} was already used for a different request")
+        self.key = key
+
+
+def request_fingerprint(*parts) -> str:
+    """Stable hash of the fields that make two requests 'the same request'."""
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class _Entry:
+    __slots__ = ("fingerprint", "task", "expires_at")
+
+    def __init__(self, fingerprint: str, task: asyncio.Task):
+        self.fingerprint = fingerprint
+        self.task = task
+        self.expires_at = None  # set when the execution succeeds
+
+
+class IdempotencyStore:
+    """Runs each idempotency key at most once and replays its result.
+
+    - The first request for a key starts the execution as its own task.
+    - Requests arriving while it runs attach to that task instead of
+      starting another one.
+    - A successful result is kept for `ttl` seconds (at most `max_entries`
+      results, oldest first out) and returned to later retries.
+    - A failed execution is forgotten so the client can retry it.
+
+    The execution is shielded from the caller: a client that times out and
+    disconnects does not cancel the order, and its retry picks up the
+    result. State is per process, so retries must reach the same worker.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> _Entry, completed entries in completion order
+        self.executions = 0
+        self.joined = 0
+        self.replayed = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "executions": self.executions,
+                "joined": self.joined, "replayed": self.replayed}
+
+    def _evict(self):
+        now = time.monotonic()
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry.expires_at is None:
+                break  # in flight; everything behind it is newer
+            if len(self._entries) <= self.max_entries and entry.expires_at > now:
+                break
+            self._entries.popitem(last=False)
+
+    def _on_done(self, key, entry: _Entry, task: asyncio.Task):
+        if self._entries.get(key) is not entry:
+            return
+        if task.cancelled() or task.exception() is not None:
+            del self._entries[key]
+            return
+        entry.expires_at = time.monotonic() + self.ttl
+        self._entries.move_to_end(key)
+
+    async def run(self, key, fingerprint: str, factory):
+        """Return (result, replayed) for `key`, calling `factory()` only if nothing ran or is running."""
+        self._evict()
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at is not None and entry.expires_at <= time.monotonic():
+            del self._entries[key]
+            entry = None
+        if entry is not None:
+            if entry.fingerprint != fingerprint:
+                raise IdempotencyKeyConflict(key[-1] if isinstance(key, tuple) else key)
+            if entry.task.done():
+                self.replayed += 1
+            else:
+                self.joined += 1
+            return await asyncio.shield(entry.task), True
+
+        task = asyncio.ensure_future(factory())
+        entry = _Entry(fingerprint, task)
+        self._entries[key] = entry
+        task.add_done_callback(lambda t: self._on_done(key, entry, t))
+        self.executions += 1
+        return await asyncio.shield(task), False
@@ -0,0 +1,244 @@
+import heapq
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+# Reservations not committed within this many seconds return their stock
+DEFAULT_RESERVATION_TTL = 300.0
+
+
+class InsufficientStock(Exception):
+    """Raised when a reservation cannot be fully satisfied; nothing is reserved."""
+
+    def __init__(self, sku: str, requested: int, available: int):
+        super().__init__(f"Insufficient stock for {sku}: requested {requested}, available {available}")
+        self.sku = sku
+        self.requested = requested
+        self.available = available
+
+
+@dataclass
+class Reservation:
+    id: str
+    lines: dict  # sku -> quantity
+    expires_at: float
+
+
+def _normalize_lines(lines: dict) -> dict:
+    merged = {}
+    for sku, quantity in lines.items():
+        if quantity <= 0:
+            raise ValueError(f"Quantity for {sku} must be positive, got {quantity}")
+        merged[sku] = merged.get(sku, 0) + int(quantity)
+    return merged
+
+
+class InventoryStore(ABC):
+    """Stock levels with atomic, all-or-nothing reservations.
+
+    reserve() takes stock out of `available` immediately; commit() makes the
+    decrement permanent and release() (or expiry) puts it back.
+    """
+
+    @abstractmethod
+    def available(self, sku: str) -> int:
+        ...
+
+    @abstractmethod
+    def reserve(self, lines: dict, ttl: float = DEFAULT_RESERVATION_TTL) -> Reservation:
+        """Reserve every line (sku -> quantity) or none; raises InsufficientStock."""
+
+    @abstractmethod
+    def commit(self, reservation_id: str) -> bool:
+        """Finalize a reservation; False if it is unknown or already expired."""
+
+    @abstractmethod
+    def release(self, reservation_id: str) -> bool:
+        """Return a reservation's stock; False if it is unknown or already settled."""
+
+    @abstractmethod
+    def release_expired(self) -> int:
+        """Release every reservation past its expiry; returns how many were released."""
+
+    def reserve_one(self, sku: str, quantity: int, ttl: float = DEFAULT_RESERVATION_TTL) -> Reservation:
+        return self.reserve({sku: quantity}, ttl)
+
+    def take(self, lines: dict) -> Reservation:
+        """Reserve and commit in one step (an order with no hold period)."""
+        reservation = self.reserve(lines)
+        self.commit(reservation.id)
+        return reservation
+
+
+class InMemoryInventory(InventoryStore):
+    """Process-local inventory with one lock per SKU.
+
+    Multi-line reservations lock their SKUs in sorted order, so concurrent
+    orders over overlapping SKUs cannot deadlock, and orders over disjoint
+    SKUs never contend.
+    """
+
+    def __init__(self, stock: dict = None):
+        self._stock = dict(stock or {})
+        self._locks = {sku: threading.Lock() for sku in self._stock}
+        self._locks_guard = threading.Lock()
+        self._reservations = {}
+        self._expiry_heap = []  # (expires_at, reservation_id)
+        self._reservations_lock = threading.Lock()
+
+    def _lock(self, sku: str) -> threading.Lock:
+        lock = self._locks.get(sku)
+        if lock is None:
+            with self._locks_guard:
+                lock = self._locks.setdefault(sku, threading.Lock())
+        return lock
+
+    def set_stock(self, sku: str, quantity: int) -> None:
+        with self._lock(sku):
+            self._stock[sku] = quantity
+
+    def available(self, sku: str) -> int:
+        return self._stock.get(sku, 0)
+
+    def reserve(self, lines: dict, ttl: float = DEFAULT_RESERVATION_TTL) -> Reservation:
+        self.release_expired()
+        lines = _normalize_lines(lines)
+        skus = sorted(lines)
+        locks = [self._lock(sku) for sku in skus]
+        for lock in locks:
+            lock.acquire()
+        try:
+            for sku in skus:
+                if self._stock.get(sku, 0) < lines[sku]:
+                    raise InsufficientStock(sku, lines[sku], self._stock.get(sku, 0))
+            for sku in skus:
+                self._stock[sku] -= lines[sku]
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+        reservation = Reservation(uuid.uuid4().hex, lines, time.monotonic() + ttl)
+        with self._reservations_lock:
+            self._reservations[reservation.id] = reservation
+            heapq.heappush(self._expiry_heap, (reservation.expires_at, reservation.id))
+        return reservation
+
+    def _settle(self, reservation_id: str) -> Reservation:
+        with self._reservations_lock:
+            return self._reservations.pop(reservation_id, None)
+
+    def commit(self, reservation_id: str) -> bool:
+        return self._settle(reservation_id) is not None
+
+    def release(self, reservation_id: str) -> bool:
+        reservation = self._settle(reservation_id)
+        if reservation is None:
+            return False
+        for sku in sorted(reservation.lines):
+            with self._lock(sku):
+                self._stock[sku] += reservation.lines[sku]
+        return True
+
+    def release_expired(self) -> int:
+        now = time.monotonic()
+        expired = []
+        with self._reservations_lock:
+            while self._expiry_heap and self._expiry_heap[0][0] <= now:
+                _, reservation_id = heapq.heappop(self._expiry_heap)
+                if reservation_id in self._reservations:
+                    expired.append(reservation_id)
+        return sum(self.release(reservation_id) for reservation_id in expired)
+
+
+class SqliteInventory(InventoryStore):
+    """SQLite-backed inventory shared by every process that opens the same file.
+
+    Each reservation is a single IMMEDIATE transaction of conditional
+    decrements (`available = available - q WHERE available >= q`), so the
+    check and the decrement cannot be separated by another writer.
+    """
+
+    def __init__(self, path: str, stock: dict = None, busy_timeout: float = 30.0):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        db = self._db()
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("CREATE TABLE IF NOT EXISTS stock (sku TEXT PRIMARY KEY, available INTEGER NOT NULL CHECK (available >= 0))")
+        db.execute("CREATE TABLE IF NOT EXISTS reservations (id TEXT, sku TEXT, quantity INTEGER, expires_at REAL)")
+        db.execute("CREATE INDEX IF NOT EXISTS reservations_id ON reservations (id)")
+        db.execute("CREATE INDEX IF NOT EXISTS reservations_expiry ON reservations (expires_at)")
+        if stock:
+            # Seed only SKUs that are not in the database yet
+            db.executemany("INSERT OR IGNORE INTO stock (sku, available) VALUES (?, ?)", stock.items())
+
+    def _db(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            # Autocommit mode; transactions are opened explicitly with BEGIN IMMEDIATE
+            db = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            self._local.db = db
+        return db
+
+    def set_stock(self, sku: str, quantity: int) -> None:
+        self._db().execute(
+            "INSERT INTO stock (sku, available) VALUES (?, ?) ON CONFLICT(sku) DO UPDATE SET available = excluded.available",
+            (sku, quantity),
+        )
+
+    def available(self, sku: str) -> int:
+        row = self._db().execute("SELECT available FROM stock WHERE sku = ?", (sku,)).fetchone()
+        return row[0] if row else 0
+
+    def reserve(self, lines: dict, ttl: float = DEFAULT_RESERVATION_TTL) -> Reservation:
+        self.release_expired()
+        lines = _normalize_lines(lines)
+        reservation = Reservation(uuid.uuid4().hex, lines, time.time() + ttl)
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            for sku in sorted(lines):
+                cur = db.execute(
+                    "UPDATE stock SET available = available - ? WHERE sku = ? AND available >= ?",
+                    (lines[sku], sku, lines[sku]),
+                )
+                if cur.rowcount == 0:
+                    raise InsufficientStock(sku, lines[sku], self.available(sku))
+            db.executemany(
+                "INSERT INTO reservations (id, sku, quantity, expires_at) VALUES (?, ?, ?, ?)",
+                [(reservation.id, sku, q, reservation.expires_at) for sku, q in lines.items()],
+            )
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return reservation
+
+    def commit(self, reservation_id: str) -> bool:
+        cur = self._db().execute("DELETE FROM reservations WHERE id = ?", (reservation_id,))
+        return cur.rowcount > 0
+
+    def _release_where(self, clause: str, params: tuple) -> int:
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            rows = db.execute(f"SELECT id, sku, quantity FROM reservations WHERE {clause}", params).fetchall()
+            db.executemany("UPDATE stock SET available = available + ? WHERE sku = ?", [(q, sku) for _, sku, q in rows])
+            db.execute(f"DELETE FROM reservations WHERE {clause}", params)
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return len({reservation_id for reservation_id, _, _ in rows})
+
+    def release(self, reservation_id: str) -> bool:
+        return self._release_where("id = ?", (reservation_id,)) > 0
+
+    def release_expired(self) -> int:
+        now = time.time()
+        # Cheap read first so the common case takes no write lock
+        if self._db().execute("SELECT 1 FROM reservations WHERE expires_at <= ? LIMIT 1", (now,)).fetchone() is None:
+            return 0
+        return self._release_where("expires_at <= ?", (now,))
@@ -1,72 +1,258 @@
-from fastapi import FastAPI, HTTPException, Query
-from fastapi.responses import HTMLResponse
-from pydantic import BaseModel
+import asyncio
+import json
+import os
+import time
+from collections import defaultdict
+
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.responses import HTMLResponse, StreamingResponse
+from pydantic import BaseModel, model_validator
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.events import Event, EventActions
 from google.adk.runners import Runner
 
 # Import root_agent from agent module (support both package and script contexts)
 try:
-    from ecommerce_agent.agent import root_agent
+    from ecommerce_agent.agent import ORDER_REQUEST_KEY, fast_path_agent, root_agent
+    from ecommerce_agent.sessions import make_session_service
+    from ecommerce_agent.idempotency import IdempotencyKeyConflict, IdempotencyStore, request_fingerprint
 except ImportError:
-    from agent import root_agent
+    from agent import ORDER_REQUEST_KEY, fast_path_agent, root_agent
+    from sessions import make_session_service
+    from idempotency import IdempotencyKeyConflict, IdempotencyStore, request_fingerprint
 
-from google.adk.sessions import InMemorySessionService
 from google.genai import types as genai_types
-from typing import Optional
+from typing import List, Optional
 
 app = FastAPI()
 
 class UserRequest(BaseModel):
-    user_input: str
+    user_input: str = ""
     user_id: str = "user1"
     session_id: str = "session1"
+    # Structured order: when both are set the request takes the deterministic fast path
+    product_query: Optional[str] = None
+    quantity: Optional[int] = None
+    # Retries that carry the same key reuse the first execution instead of ordering again
+    idempotency_key: Optional[str] = None
+
+    @model_validator(mode="after")
+    def _check_structured_order(self):
+        if (self.product_query is None) != (self.quantity is None):
+            raise ValueError("product_query and quantity must be sent together.")
+        if self.quantity is not None and self.quantity <= 0:
+            raise ValueError("quantity must be positive.")
+        if self.product_query is not None and not self.product_query.strip():
+            raise ValueError("product_query must not be empty.")
+        if not self.user_input and self.product_query:
+            # Only the conversation record; the agent reads the structured fields from session state
+            self.user_input = f"buy {self.quantity} units of {self.product_query}"
+        if not self.user_input:
+            raise ValueError("Provide user_input, or product_query and quantity.")
+        return self
+
+    def structured_order(self) -> Optional[dict]:
+        if self.product_query is None:
+            return None
+        return {"product_query": self.product_query.strip(), "quantity": self.quantity}
+
+APP_NAME = "ECommerce_app"
+
+class BatchRequest(BaseModel):
+    requests: List[UserRequest]
+    max_concurrency: Optional[int] = None
+
+# Upper bound on agent runs in flight for one /chat/batch call
+BATCH_MAX_CONCURRENCY = int(os.getenv("CHAT_BATCH_MAX_CONCURRENCY", "16"))
+
+# Session service: in memory with TTL/LRU eviction, or a shared database when
+# SESSION_DB_URL is set (see sessions.py)
+session_service = make_session_service()
+
+# Results of requests sent with an idempotency key, replayed to client retries
+idempotency_store = IdempotencyStore(
+    ttl=float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400")),
+    max_entries=int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "100000"))
+)
 
-# Initialize in-memory session service
-session_service = InMemorySessionService()
+# Build the runner once at startup; it holds no per-request state
+runner = Runner(
+    agent=root_agent,
+    app_name=APP_NAME,
+    session_service=session_service
+)
 
-async def _process_chat(user_input: str, user_id: str, session_id: str):
+def _event_text(event) -> str:
+    """Concatenate the text parts of an ADK event."""
+    if event.content and event.content.parts:
+        return "".join(
+            part.text for part in event.content.parts if hasattr(part, 'text') and part.text
+        )
+    return ""
+
+async def _stage_order(user_id: str, session_id: str, order: Optional[dict]):
+    """Hand a structured order to the fast path through session state; it is read once, on the next turn."""
+    if not order or root_agent is not fast_path_agent:
+        return
+    session = await session_service.get_session(app_name=APP_NAME, user_id=user_id, session_id=session_id)
+    await session_service.append_event(
+        session, Event(author="user", actions=EventActions(state_delta={ORDER_REQUEST_KEY: order}))
+    )
+
+async def _process_chat(user_input: str, user_id: str, session_id: str, order: Optional[dict] = None):
     """
     Common chat handler:
     - Ensures a session exists (creates if needed)
-    - Wraps user_input into Content and runs root_agent via Runner
+    - Stages a structured order (product_query, quantity) for the fast path, if given
+    - Wraps user_input into Content and runs root_agent via the shared Runner
     - Extracts and returns the final answer
     """
-    # Asynchronously create or retrieve session
-    await session_service.create_session(
-        app_name="ECommerce_app",
+    # Get the existing session or create it on first use
+    await session_service.ensure_session(
+        app_name=APP_NAME,
         user_id=user_id,
         session_id=session_id
     )
-    # Prepare runner
-    runner = Runner(
-        agent=root_agent,
-        app_name="ECommerce_app",
-        session_service=session_service
-    )
+    await _stage_order(user_id, session_id, order)
     # Wrap user input into Content for ADK
     user_content = genai_types.Content(
         role="user",
         parts=[genai_types.Part(text=user_input)]
     )
+
+    # Drive the agent on the event loop so slow LLM calls don't stall other requests.
+    # Each sub-agent of the workflow ends with a final response; keep the last one.
+    final_answer = ""
     try:
-        # Invoke the agent
-        events = runner.run(
+        async for event in runner.run_async(
             user_id=user_id,
             session_id=session_id,
             new_message=user_content
-        )
+        ):
+            if hasattr(event, "is_final_response") and event.is_final_response():
+                text = _event_text(event)
+                if text:
+                    final_answer = text
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    return {"response": final_answer}
+
+async def _process_chat_once(user_input: str, user_id: str, session_id: str,
+                             idempotency_key: Optional[str] = None, order: Optional[dict] = None):
+    """
+    Idempotent chat handler:
+    - Without a key, runs _process_chat as usual
+    - With a key, the first request runs the agent; retries that arrive while it runs
+      wait for the same execution, and later retries get the stored result
+    - Returns (result, replayed)
+    """
+    if not idempotency_key:
+        return await _process_chat(user_input, user_id, session_id, order), False
+    try:
+        return await idempotency_store.run(
+            (user_id, idempotency_key),
+            request_fingerprint(session_id, user_input, order),
+            lambda: _process_chat(user_input, user_id, session_id, order)
+        )
+    except IdempotencyKeyConflict as e:
+        raise HTTPException(status_code=422, detail=str(e))
 
-    # Extract final response text
+async def _process_chat_batch(requests: List[UserRequest], max_concurrency: int = BATCH_MAX_CONCURRENCY):
+    """
+    Batch chat handler:
+    - Runs up to max_concurrency requests at once through _process_chat
+    - Requests that share a (user_id, session_id) run one after another, in input order,
+      so they never interleave in the same session
+    - Returns one result per request, in input order, with its own timing and error
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    session_locks = defaultdict(asyncio.Lock)
+
+    async def run_one(index: int, request: UserRequest):
+        queued_at = time.perf_counter()
+        # Take the session lock first so queued requests don't hold a concurrency slot
+        async with session_locks[(request.user_id, request.session_id)]:
+            async with semaphore:
+                started_at = time.perf_counter()
+                response, error = None, None
+                try:
+                    result, _ = await _process_chat_once(
+                        request.user_input, request.user_id, request.session_id,
+                        request.idempotency_key, request.structured_order()
+                    )
+                    response = result["response"]
+                except HTTPException as e:
+                    error = e.detail
+                except Exception as e:
+                    error = str(e)
+                finished_at = time.perf_counter()
+        return {
+            "index": index,
+            "user_id": request.user_id,
+            "session_id": request.session_id,
+            "response": response,
+            "error": error,
+            "queued_ms": round((started_at - queued_at) * 1000, 1),
+            "elapsed_ms": round((finished_at - started_at) * 1000, 1),
+        }
+
+    return await asyncio.gather(*(run_one(i, r) for i, r in enumerate(requests)))
+
+def _sse(event_name: str, data: dict) -> str:
+    """Format one Server-Sent Events message."""
+    return f"event: {event_name}\ndata: {json.dumps(data)}\n\n"
+
+async def _stream_chat(request: Request, user_input: str, user_id: str, session_id: str,
+                       order: Optional[dict] = None):
+    """
+    Streaming chat handler:
+    - Runs root_agent with SSE streaming so partial LLM output is forwarded as it arrives
+    - Emits one SSE message per ADK event, tagged with the sub-agent that produced it
+    - Stops the agent run as soon as the client disconnects
+    """
+    events = None
     final_answer = ""
-    for event in events:
-        if hasattr(event, "is_final_response") and event.is_final_response():
-            if event.content and event.content.parts:
-                final_answer = "".join(
-                    part.text for part in event.content.parts if hasattr(part, 'text') and part.text
-                )
-            break
-    return {"response": final_answer}
+    try:
+        # Inside the try, so a session or staging failure reaches the client as an error event
+        await session_service.ensure_session(
+            app_name=APP_NAME,
+            user_id=user_id,
+            session_id=session_id
+        )
+        await _stage_order(user_id, session_id, order)
+        user_content = genai_types.Content(
+            role="user",
+            parts=[genai_types.Part(text=user_input)]
+        )
+        events = runner.run_async(
+            user_id=user_id,
+            session_id=session_id,
+            new_message=user_content,
+            run_config=RunConfig(streaming_mode=StreamingMode.SSE)
+        )
+        async for event in events:
+            if await request.is_disconnected():
+                break
+            text = _event_text(event)
+            is_final = event.is_final_response()
+            if is_final and text:
+                final_answer = text
+            if not text and not is_final:
+                continue  # tool calls/responses carry no user-visible text
+            yield _sse("message", {
+                "author": event.author,
+                "partial": bool(event.partial),
+                "final": is_final,
+                "text": text,
+            })
+        else:
+            yield _sse("done", {"response": final_answer})
+    except Exception as e:
+        yield _sse("error", {"detail": str(e)})
+    finally:
+        # Closing the generator cancels any LLM call still in flight for this request
+        if events is not None:
+            await events.aclose()
 
 @app.get("/", response_class=HTMLResponse)
 def read_root():
@@ -97,18 +283,30 @@ def read_root():
     """
 
 @app.post("/chat")
-async def chat(request: UserRequest):
+async def chat(
+    request: UserRequest,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
     """
     POST /chat
     Process a chat request using JSON body parameters.
+    Send an Idempotency-Key header (or idempotency_key field) to make retries safe.
     """
-    return await _process_chat(request.user_input, request.user_id, request.session_id)
+    result, replayed = await _process_chat_once(
+        request.user_input, request.user_id, request.session_id,
+        idempotency_key or request.idempotency_key, request.structured_order()
+    )
+    response.headers["Idempotent-Replayed"] = "true" if replayed else "false"
+    return result
 
 @app.get("/chat")
 async def chat_get(
+    response: Response,
     user_input: Optional[str] = Query(None, description="The user's message"),
     user_id: str = Query("user1", description="Identifier for the user"),
-    session_id: str = Query("session1", description="Identifier for the session")
+    session_id: str = Query("session1", description="Identifier for the session"),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
     """
     GET /chat
@@ -119,4 +317,54 @@ async def chat_get(
             status_code=400,
             detail="Query parameter 'user_input' is required. Example: /chat?user_input=Hello"
         )
-    return await _process_chat(user_input, user_id, session_id)
+    result, replayed = await _process_chat_once(user_input, user_id, session_id, idempotency_key)
+    response.headers["Idempotent-Replayed"] = "true" if replayed else "false"
+    return result
+
+@app.post("/chat/stream")
+async def chat_stream(request: Request, body: UserRequest):
+    """
+    POST /chat/stream
+    Stream agent events for a JSON chat request as Server-Sent Events.
+    """
+    return StreamingResponse(
+        _stream_chat(request, body.user_input, body.user_id, body.session_id, body.structured_order()),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/chat/stream")
+async def chat_stream_get(
+    request: Request,
+    user_input: Optional[str] = Query(None, description="The user's message"),
+    user_id: str = Query("user1", description="Identifier for the user"),
+    session_id: str = Query("session1", description="Identifier for the session")
+):
+    """
+    GET /chat/stream
+    Stream agent events as Server-Sent Events (usable from a browser EventSource).
+    """
+    if not user_input:
+        raise HTTPException(
+            status_code=400,
+            detail="Query parameter 'user_input' is required. Example: /chat/stream?user_input=Hello"
+        )
+    return StreamingResponse(
+        _stream_chat(request, user_input, user_id, session_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/chat/batch")
+async def chat_batch(batch: BatchRequest):
+    """
+    POST /chat/batch
+    Process many chat requests concurrently; results come back in input order.
+    """
+    max_concurrency = min(batch.max_concurrency or BATCH_MAX_CONCURRENCY, BATCH_MAX_CONCURRENCY)
+    started_at = time.perf_counter()
+    results = await _process_chat_batch(batch.requests, max_concurrency)
+    return {
+        "results": results,
+        "elapsed_ms": round((time.perf_counter() - started_at) * 1000, 1),
+    }
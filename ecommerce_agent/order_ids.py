@@ -0,0 +1,71 @@
+import os
+import threading
+import time
+
+# Crockford base32, as used by ULID: sorts in the same order as the encoded integer
+_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_RANDOM_BITS = 80
+_RANDOM_MAX = (1 << _RANDOM_BITS) - 1
+
+
+def _encode(value: int, length: int = 26) -> str:
+    chars = []
+    for _ in range(length):
+        chars.append(_ALPHABET[value & 31])
+        value >>= 5
+    return "".join(reversed(chars))
+
+
+class OrderIdGenerator:
+    """Monotonic, lexicographically sortable ULID-style IDs.
+
+    Each ID is a 48-bit millisecond timestamp followed by 80 random bits.
+    Within one millisecond the random part is incremented rather than
+    redrawn, so IDs from one process are strictly increasing. Processes
+    never coordinate: two workers collide only if they draw the same 80
+    random bits in the same millisecond. A forked child starts from a fresh
+    random draw instead of continuing its parent's sequence.
+    """
+
+    def __init__(self, prefix: str = "ORD-"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._last_random = 0
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self._lock = threading.Lock()
+        self._last_ms = -1
+
+    def new_id(self) -> str:
+        with self._lock:
+            now_ms = time.time_ns() // 1_000_000
+            if now_ms > self._last_ms:
+                self._last_ms = now_ms
+                self._last_random = int.from_bytes(os.urandom(10), "big")
+            else:
+                # Same millisecond (or the clock stepped back): keep counting from the last ID
+                self._last_random += 1
+                if self._last_random > _RANDOM_MAX:
+                    self._last_ms += 1
+                    self._last_random = int.from_bytes(os.urandom(10), "big")
+            value = (self._last_ms << _RANDOM_BITS) | self._last_random
+        return self.prefix + _encode(value)
+
+
+_default_generator = OrderIdGenerator()
+
+
+def new_order_id() -> str:
+    """Return a new unique order ID such as 'ORD-01J9ZK3V6D8Q2W4X5Y7Z9A0B1C'."""
+    return _default_generator.new_id()
+
+
+def order_id_timestamp(order_id: str, prefix: str = "ORD-") -> float:
+    """Creation time (Unix seconds) encoded in an order ID."""
+    value = 0
+    for char in order_id[len(prefix):]:
+        value = (value << 5) | _ALPHABET.index(char)
+    return (value >> _RANDOM_BITS) / 1000
@@ -0,0 +1,141 @@
+import asyncio
+import os
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Optional
+
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, DatabaseSessionService, InMemorySessionService, Session
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+
+# Configuration (environment variables)
+# SESSION_DB_URL: SQLAlchemy URL of a shared session database, e.g. sqlite:///./sessions.db.
+#   Unset keeps sessions in process memory.
+# SESSION_MAX_ACTIVE: sessions tracked per worker before the least recently used is evicted.
+# SESSION_IDLE_TTL_SECONDS: sessions idle longer than this are evicted.
+DEFAULT_MAX_ACTIVE = 10_000
+DEFAULT_IDLE_TTL_SECONDS = 3600
+
+
+class ManagedSessionService(BaseSessionService):
+    """Session service wrapper with get-or-create and TTL/LRU eviction.
+
+    Every session touched through this service is tracked in access order.
+    Sessions idle for more than `idle_ttl` seconds, or beyond `max_active`,
+    are evicted from tracking. With `evict_from_backend` (the in-memory
+    backend) eviction also deletes the session, which bounds memory. With
+    a database backend the session stays in the database and tracking only
+    saves the existence check in ensure_session.
+
+    Get-or-create is serialized per session key within the worker; a create
+    that loses a race with another worker on the shared database falls back
+    to reading the session the winner created.
+    """
+
+    def __init__(self, backend: BaseSessionService, max_active: int = DEFAULT_MAX_ACTIVE,
+                 idle_ttl: float = DEFAULT_IDLE_TTL_SECONDS, evict_from_backend: bool = True):
+        self.backend = backend
+        self.max_active = max_active
+        self.idle_ttl = idle_ttl
+        self.evict_from_backend = evict_from_backend
+        self._last_access = OrderedDict()  # (app_name, user_id, session_id) -> monotonic time
+        self._create_locks = weakref.WeakValueDictionary()  # same key -> asyncio.Lock while in use
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._last_access)
+
+    async def _touch(self, app_name: str, user_id: str, session_id: str):
+        key = (app_name, user_id, session_id)
+        self._last_access[key] = time.monotonic()
+        self._last_access.move_to_end(key)
+        await self._evict()
+
+    async def _evict(self):
+        now = time.monotonic()
+        expired = []
+        # OrderedDict is in access order, so stale entries are at the front
+        while self._last_access:
+            key, last_access = next(iter(self._last_access.items()))
+            if len(self._last_access) <= self.max_active and now - last_access <= self.idle_ttl:
+                break
+            self._last_access.popitem(last=False)
+            expired.append(key)
+        for app_name, user_id, session_id in expired:
+            self.evictions += 1
+            if self.evict_from_backend:
+                await self.backend.delete_session(app_name=app_name, user_id=user_id, session_id=session_id)
+
+    async def ensure_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        """Create the session unless it already exists; never resets an existing one."""
+        if (app_name, user_id, session_id) not in self._last_access:
+            await self.get_or_create_session(app_name=app_name, user_id=user_id, session_id=session_id)
+        else:
+            await self._touch(app_name, user_id, session_id)
+
+    async def get_or_create_session(self, *, app_name: str, user_id: str, session_id: str) -> Session:
+        key = (app_name, user_id, session_id)
+        lock = self._create_locks.get(key)
+        if lock is None:
+            lock = self._create_locks[key] = asyncio.Lock()
+        async with lock:
+            session = await self.backend.get_session(app_name=app_name, user_id=user_id, session_id=session_id)
+            if session is None:
+                try:
+                    session = await self.backend.create_session(
+                        app_name=app_name, user_id=user_id, session_id=session_id
+                    )
+                except Exception:
+                    # Another worker created it first (duplicate primary key): use theirs
+                    session = await self.backend.get_session(
+                        app_name=app_name, user_id=user_id, session_id=session_id
+                    )
+                    if session is None:
+                        raise
+        await self._touch(app_name, user_id, session.id)
+        return session
+
+    async def create_session(self, *, app_name: str, user_id: str, state: Optional[dict[str, Any]] = None,
+                             session_id: Optional[str] = None) -> Session:
+        session = await self.backend.create_session(
+            app_name=app_name, user_id=user_id, state=state, session_id=session_id
+        )
+        await self._touch(app_name, user_id, session.id)
+        return session
+
+    async def get_session(self, *, app_name: str, user_id: str, session_id: str,
+                          config: Optional[GetSessionConfig] = None) -> Optional[Session]:
+        session = await self.backend.get_session(
+            app_name=app_name, user_id=user_id, session_id=session_id, config=config
+        )
+        if session is not None:
+            await self._touch(app_name, user_id, session_id)
+        return session
+
+    async def list_sessions(self, *, app_name: str, user_id: str) -> ListSessionsResponse:
+        return await self.backend.list_sessions(app_name=app_name, user_id=user_id)
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        self._last_access.pop((app_name, user_id, session_id), None)
+        await self.backend.delete_session(app_name=app_name, user_id=user_id, session_id=session_id)
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        event = await self.backend.append_event(session=session, event=event)
+        key = (session.app_name, session.user_id, session.id)
+        if key in self._last_access:
+            self._last_access[key] = time.monotonic()
+            self._last_access.move_to_end(key)
+        return event
+
+
+def make_session_service() -> ManagedSessionService:
+    """Build the session service from SESSION_* environment variables."""
+    max_active = int(os.getenv("SESSION_MAX_ACTIVE", DEFAULT_MAX_ACTIVE))
+    idle_ttl = float(os.getenv("SESSION_IDLE_TTL_SECONDS", DEFAULT_IDLE_TTL_SECONDS))
+    db_url = os.getenv("SESSION_DB_URL")
+    if db_url:
+        # Shared by every uvicorn worker; sessions outlive the process
+        return ManagedSessionService(DatabaseSessionService(db_url=db_url), max_active, idle_ttl,
+                                     evict_from_backend=False)
+    return ManagedSessionService(InMemorySessionService(), max_active, idle_ttl, evict_from_backend=True)
@@ -1,7 +1,10 @@
+import os
+import random
+import time
 from dotenv import load_dotenv
 load_dotenv()
-from google.adk.agents import LlmAgent, Agent
-from google.adk.models.lite_llm import LiteLlm
+from google.adk.agents import LlmAgent, Agent, BaseAgent
+from google.adk.events import Event, EventActions
 from google.adk.runners import Runner
 from google.adk.sessions import InMemorySessionService
 import uuid
@@ -18,20 +21,30 @@ except ImportError:
 
 
 
+try:
+    from .model_registry import ModelRegistry
+except ImportError:
+    from model_registry import ModelRegistry
+
+# One LiteLlm per model for every agent in the process, with pooled HTTP clients and
+# per-provider rate limits (LLM_RATE_LIMITS, LLM_MAX_CONNECTIONS)
+model_registry = ModelRegistry.from_env()
+SMALL_TALK_MODEL = "anthropic/claude-3-sonnet-20240229"
+
 # --- Agent Definitions ---
 def get_weather(location: str) -> str:
     """Tool to get weather information for a specified location (example)"""
     return f"The weather in {location} is sunny and warm."
 
 greeting_agent = Agent(
-    model=LiteLlm(model="anthropic/claude-3-sonnet-20240229"),
+    model=model_registry.get(SMALL_TALK_MODEL),
     name="greeting_agent",
     description="Specializes in providing friendly greetings to the user.",
     instruction="You are the Greeting Agent. Your ONLY task is to provide a friendly greeting to the user. Be concise and welcoming."
 )
 
 farewell_agent = Agent(
-    model=LiteLlm(model="anthropic/claude-3-sonnet-20240229"),
+    model=model_registry.get(SMALL_TALK_MODEL),
     name="farewell_agent",
     description="Specializes in providing friendly farewells to the user.",
     instruction="You are the Farewell Agent. Your ONLY task is to provide a friendly farewell when the user indicates they are leaving. Be concise."
@@ -55,7 +68,7 @@ If no location is provided, you can ask the user for a location.""",
     tools=[get_weather]
 )
 
-root_agent = LlmAgent(
+orchestrator_agent = LlmAgent(
     model=MODEL_NAME,
     name="root_orchestrator_agent",
     description="The main orchestrator agent that understands user requests and delegates to specialized agents.",
@@ -74,6 +87,106 @@ Provide only the response from the delegated agent, without adding your own conv
         weather_specific_agent
     ]
 )
+try:
+    from .intent_router import (FAREWELL, GREETING, QUESTION, TRAINING_EXAMPLES, WEATHER,
+                                IntentRouter, NaiveBayesIntentClassifier, RouterStats)
+except ImportError:
+    from intent_router import (FAREWELL, GREETING, QUESTION, TRAINING_EXAMPLES, WEATHER,
+                               IntentRouter, NaiveBayesIntentClassifier, RouterStats)
+
+GREETING_REPLIES = [
+    "Hello! How can I help you today?",
+    "Hi there! What can I do for you?",
+    "Hey! Ask me anything, or ask about the weather somewhere.",
+]
+FAREWELL_REPLIES = [
+    "Goodbye! Have a great day.",
+    "Take care, see you next time!",
+    "Bye for now! Come back anytime.",
+]
+TEMPLATED_REPLIES = {GREETING: GREETING_REPLIES, FAREWELL: FAREWELL_REPLIES}
+# Sub-agents that confidently routed intents go to directly
+DIRECT_ROUTES = {QUESTION: question_answer_agent, WEATHER: weather_specific_agent}
+
+class IntentRouterAgent(BaseAgent):
+    """Routes confident intents without the orchestrator's LLM hop.
+
+    Greetings and farewells get a templated reply (no LLM at all), weather
+    and general questions go straight to their sub-agent, and anything the
+    rules (or the optional classifier) are unsure about is delegated by the
+    orchestrator LLM as before. Hits per route and the estimated time saved
+    are kept in `stats`.
+    """
+
+    def __init__(self, orchestrator: LlmAgent, router: IntentRouter):
+        super().__init__(
+            name="greet_router",
+            description="Rule-based intent routing in front of the orchestrator agent.",
+            sub_agents=[orchestrator]
+        )
+        self._router = router
+        # LLM steps each route skips compared with going through the orchestrator
+        self._stats = RouterStats({
+            GREETING: (orchestrator.name, greeting_agent.name),
+            FAREWELL: (orchestrator.name, farewell_agent.name),
+            QUESTION: (orchestrator.name,),
+            WEATHER: (orchestrator.name,),
+        })
+
+    @property
+    def stats(self) -> RouterStats:
+        return self._stats
+
+    def _event(self, ctx, text: str) -> Event:
+        return Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=text)]),
+            actions=EventActions()
+        )
+
+    async def _delegate(self, ctx):
+        """Runs the orchestrator, timing its routing hop and the agent it transfers to."""
+        orchestrator = self.sub_agents[0]
+        start = step_start = time.perf_counter()
+        target = None
+        async for event in orchestrator.run_async(ctx):
+            if target is None and event.actions and event.actions.transfer_to_agent:
+                target = event.actions.transfer_to_agent
+                step_start = time.perf_counter()
+                self.stats.observe_step(orchestrator.name, step_start - start)
+            yield event
+        if target:
+            self.stats.observe_step(target, time.perf_counter() - step_start)
+
+    async def _run_async_impl(self, ctx):
+        user_text = ""
+        if ctx.user_content and ctx.user_content.parts:
+            user_text = "".join(p.text for p in ctx.user_content.parts if getattr(p, "text", None))
+        start = time.perf_counter()
+        intent, source = self._router.route(user_text)
+        if intent in TEMPLATED_REPLIES:
+            yield self._event(ctx, random.choice(TEMPLATED_REPLIES[intent]))
+        elif intent in DIRECT_ROUTES:
+            async for event in DIRECT_ROUTES[intent].run_async(ctx):
+                yield event
+        else:
+            async for event in self._delegate(ctx):
+                yield event
+        self.stats.record(intent or "llm", source, time.perf_counter() - start)
+
+# GREET_ROUTER_CLASSIFIER=1 adds a naive Bayes fallback for phrasings the keyword rules miss
+intent_classifier = (
+    NaiveBayesIntentClassifier().fit(TRAINING_EXAMPLES)
+    if os.getenv("GREET_ROUTER_CLASSIFIER", "0") == "1" else None
+)
+# GREET_FAST_ROUTER=0 sends every message through the orchestrator LLM
+router_agent = IntentRouterAgent(
+    orchestrator_agent,
+    IntentRouter(intent_classifier, threshold=float(os.getenv("GREET_ROUTER_THRESHOLD", "0.9")))
+) if os.getenv("GREET_FAST_ROUTER", "1") != "0" else None
+root_agent = router_agent or orchestrator_agent
 # --- End of Agent Definitions ---
 
 if __name__ == "__main__":
@@ -102,6 +215,9 @@ if __name__ == "__main__":
                     print(final_text)
         except KeyboardInterrupt:
             print("\nExiting...")
+            if router_agent:
+                print("Router stats:", router_agent.stats.snapshot())
+            print("Model stats:", model_registry.stats())
             break
         except Exception as e:
             print(f"Error: {str(e)}")    
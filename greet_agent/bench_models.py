@@ -0,0 +1,158 @@
+"""Connections, 429s and latency for a burst of small-talk calls: per-agent LiteLlm vs ModelRegistry.
+
+Runs a local stand-in for the Anthropic Messages API that counts TCP
+connections, adds a fixed service time and enforces its own
+requests-per-second limit with 429s. Two agents' models send a steady
+stream from a few sequential callers, then one burst of concurrent
+calls. They run first as separate LiteLlm instances (as greet_agent
+used to build them), then through one ModelRegistry whose token bucket
+sits just under the server's limit:
+
+    python greet_agent/bench_models.py --requests 200 --server-rps 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+import litellm
+from google.adk.models.lite_llm import LiteLlm
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
+
+from model_registry import ModelRegistry, TokenBucket
+
+MODEL = "anthropic/claude-3-sonnet-20240229"
+OK_BODY = json.dumps({
+    "id": "msg_bench", "type": "message", "role": "assistant", "model": "claude-3-sonnet-20240229",
+    "content": [{"type": "text", "text": "Hello!"}], "stop_reason": "end_turn", "stop_sequence": None,
+    "usage": {"input_tokens": 10, "output_tokens": 2},
+}).encode()
+RATE_LIMITED_BODY = json.dumps({
+    "type": "error", "error": {"type": "rate_limit_error", "message": "Number of requests has exceeded your rate limit"},
+}).encode()
+
+
+class FakeAnthropic:
+    """Minimal HTTP/1.1 keep-alive server answering POST /v1/messages."""
+
+    def __init__(self, rps: float, burst: int, service_s: float):
+        self.limit = (rps, burst)
+        self.service_s = service_s
+        self.reset()
+
+    def reset(self):
+        self.bucket = TokenBucket(*self.limit)
+        self.connections = 0
+        self.requests = 0
+        self.rejected = 0
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                headers = dict(
+                    line.split(":", 1) for line in head.decode("latin-1").split("\r\n")[1:] if ":" in line
+                )
+                length = int(next((v for k, v in headers.items() if k.lower() == "content-length"), "0"))
+                await reader.readexactly(length)
+                self.requests += 1
+                # The server's own limit: reject instead of queueing
+                if self.bucket._reserve() > 0:
+                    self.bucket._release(cancelled=True)
+                    self.rejected += 1
+                    status, body = b"429 Too Many Requests", RATE_LIMITED_BODY
+                else:
+                    await asyncio.sleep(self.service_s)
+                    status, body = b"200 OK", OK_BODY
+                writer.write(b"HTTP/1.1 " + status + b"\r\nContent-Type: application/json\r\n"
+                             b"Content-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+
+def request(text: str) -> LlmRequest:
+    return LlmRequest(
+        contents=[types.Content(role="user", parts=[types.Part(text=text)])],
+        config=types.GenerateContentConfig(system_instruction="Greet the user."),
+    )
+
+
+async def call(model, i: int):
+    start = time.perf_counter()
+    try:
+        async for _ in model.generate_content_async(request(f"hello {i}")):
+            pass
+        return time.perf_counter() - start, None
+    except Exception as e:
+        return time.perf_counter() - start, type(e).__name__
+
+
+async def burst(models, n: int):
+    start = time.perf_counter()
+    results = await asyncio.gather(*(call(models[i % len(models)], i) for i in range(n)))
+    return time.perf_counter() - start, results
+
+
+async def steady(models, n: int, workers: int):
+    """n calls from `workers` sequential callers: connection reuse without a burst."""
+    async def worker(w):
+        return [await call(models[i % len(models)], i) for i in range(w, n, workers)]
+    start = time.perf_counter()
+    results = sum(await asyncio.gather(*(worker(w) for w in range(workers))), [])
+    return time.perf_counter() - start, results
+
+
+async def bench(args):
+    os.environ.setdefault("ANTHROPIC_API_KEY", "bench-key")
+    litellm.suppress_debug_info = True
+    server = FakeAnthropic(args.server_rps, args.server_burst, args.service_ms / 1000)
+    tcp = await asyncio.start_server(server.handle, "127.0.0.1", 0)
+    api_base = f"http://127.0.0.1:{tcp.sockets[0].getsockname()[1]}"
+
+    per_agent = [LiteLlm(model=MODEL, api_base=api_base, max_retries=0) for _ in range(2)]
+    # A little under the server's limit, so network jitter between the two buckets doesn't cause 429s
+    client_limit = (args.server_rps * 60 * 0.9, max(1, args.server_burst - 1))
+    registry = ModelRegistry(rate_limits={"anthropic": client_limit},
+                             max_connections=args.max_connections)
+    shared = [registry.get(MODEL, api_base=api_base, max_retries=0) for _ in range(2)]
+
+    print(f"server: {args.server_rps:g} req/s (burst {args.server_burst}), {args.service_ms:g} ms service time")
+    print(f"{'scenario':<10}{'models':<11}{'instances':>10}{'conns':>7}{'ok':>6}{'429s':>6}"
+          f"{'wall s':>8}{'p50 ms':>8}{'p95 ms':>8}")
+    scenarios = (
+        ("steady", lambda models: steady(models, args.steady_requests, args.workers)),
+        ("burst", lambda models: burst(models, args.requests)),
+    )
+    for scenario, run in scenarios:
+        for label, models in (("per-agent", per_agent), ("registry", shared)):
+            server.reset()
+            await asyncio.sleep(args.server_burst / args.server_rps)  # let both buckets refill
+            wall, results = await run(models)
+            ok = sorted(t for t, error in results if error is None)
+            p50 = statistics.median(ok) * 1000 if ok else float("nan")
+            p95 = ok[int(len(ok) * 0.95) - 1] * 1000 if ok else float("nan")
+            print(f"{scenario:<10}{label:<11}{len({id(m) for m in models}):>10}{server.connections:>7}{len(ok):>6}"
+                  f"{server.rejected:>6}{wall:>8.2f}{p50:>8.0f}{p95:>8.0f}")
+    limiter = registry.stats()["rate_limits"]["anthropic"]
+    print(f"registry queue: max depth {limiter['max_queue_depth']}, mean wait {limiter['mean_wait_ms']:.0f} ms")
+    await registry.aclose()
+    tcp.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200, help="calls in the burst")
+    parser.add_argument("--steady-requests", type=int, default=60)
+    parser.add_argument("--workers", type=int, default=4, help="sequential callers in the steady run")
+    parser.add_argument("--server-rps", type=float, default=20)
+    parser.add_argument("--server-burst", type=int, default=5)
+    parser.add_argument("--service-ms", type=float, default=50)
+    parser.add_argument("--max-connections", type=int, default=20)
+    asyncio.run(bench(parser.parse_args()))
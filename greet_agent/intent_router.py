@@ -0,0 +1,191 @@
+import math
+import re
+from collections import Counter, defaultdict
+
+GREETING, FAREWELL, WEATHER, QUESTION = "greeting", "farewell", "weather", "question"
+
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+# Whole-message patterns: "hello there!" is a greeting, "hi, what's 2+2?" is not
+GREETING_RE = re.compile(
+    r"^(?:hi|hello|hey|hiya|howdy|greetings|yo|good (?:morning|afternoon|evening|day))"
+    r"(?: (?:there|all|everyone|folks|friend|bot|agent))?[ !.,]*$"
+)
+FAREWELL_RE = re.compile(
+    r"^(?:(?:ok|okay|thanks|thank you|cheers|great)[ ,!.]+)*"
+    r"(?:bye|goodbye|bye bye|bye-bye|farewell|good ?night|take care|later|gotta go|"
+    r"see (?:you|ya)(?: later| soon| tomorrow)?|talk (?:to you )?later|i'm (?:leaving|off|done)|"
+    r"that's all(?: for now)?)(?: (?:for now|then|everyone|all))?[ !.,]*$"
+)
+WEATHER_RE = re.compile(
+    r"\b(?:weather|forecast|temperature|rain(?:ing|y)?|snow(?:ing|y)?|sunny|humid(?:ity)?|windy|"
+    r"storms?|stormy|cloudy|foggy|chilly|freezing|hail|drizzle|thunderstorms?|heatwave|umbrella|"
+    r"celsius|fahrenheit|(?:is it|how) (?:going to be )?(?:cold|hot|warm))\b"
+)
+# "Why does it rain?" mentions the weather but is a general question
+EXPLAIN_RE = re.compile(r"^(?:why|how (?:do|does|is|are)|explain|what causes|what is a|describe)\b")
+# Wh-questions and requests for an explanation; yes/no questions ("should I pack a coat
+# for Oslo?") are often about the weather, so those are left to the classifier or the LLM
+QUESTION_RE = re.compile(
+    r"^(?:what|what's|who|who's|whom|whose|which|when|where|why|how|explain|describe|define|"
+    r"tell me|list|give me)\b"
+)
+# Small talk ("hi, how are you?") reads as a question but wants a conversational reply
+SMALL_TALK_RE = re.compile(r"\b(?:how are you|how's it going|how are things|what's up|sup)\b")
+
+# Seed examples for the optional classifier; phrasings the rules above don't cover
+TRAINING_EXAMPLES = [
+    ("morning!", GREETING), ("hey hey", GREETING), ("hello again", GREETING),
+    ("hi it's me again", GREETING), ("good to see you", GREETING), ("hello hello", GREETING),
+    ("hey buddy", GREETING), ("hi friend nice to meet you", GREETING), ("greetings to you", GREETING),
+    ("i'm heading out now", FAREWELL), ("that's it from me, thanks", FAREWELL),
+    ("catch you later", FAREWELL), ("i have to go now", FAREWELL), ("signing off", FAREWELL),
+    ("thanks for the help, bye for now", FAREWELL), ("until next time", FAREWELL),
+    ("have a good one", FAREWELL), ("ok i'm done for today", FAREWELL),
+    ("do i need a jacket in berlin today", WEATHER), ("is it going to be cold in oslo", WEATHER),
+    ("should i bring sunglasses to madrid", WEATHER), ("how hot is it in cairo right now", WEATHER),
+    ("what's it like outside in paris", WEATHER), ("will it be clear skies in tokyo", WEATHER),
+    ("is it freezing in chicago", WEATHER), ("conditions in seattle this weekend", WEATHER),
+    ("any chance of showers in london tomorrow", WEATHER),
+    ("i wonder who invented the telephone", QUESTION), ("tell me about the roman empire", QUESTION),
+    ("the capital of australia", QUESTION), ("meaning of the word ephemeral", QUESTION),
+    ("help me understand photosynthesis", QUESTION), ("summarize the plot of hamlet", QUESTION),
+    ("difference between a virus and bacteria", QUESTION), ("i need the boiling point of water", QUESTION),
+    ("facts about black holes", QUESTION), ("translate hello into spanish", QUESTION),
+]
+
+
+def normalize(text: str) -> str:
+    return " ".join((text or "").lower().replace("’", "'").split())
+
+
+def match_rules(text: str):
+    """The intent a keyword rule is sure about, or None."""
+    text = normalize(text)
+    if not text or SMALL_TALK_RE.search(text):
+        return None
+    if GREETING_RE.match(text):
+        return GREETING
+    if FAREWELL_RE.match(text):
+        return FAREWELL
+    if WEATHER_RE.search(text):
+        return None if EXPLAIN_RE.match(text) else WEATHER
+    if QUESTION_RE.search(text):
+        return QUESTION
+    return None
+
+
+class NaiveBayesIntentClassifier:
+    """Multinomial naive Bayes over word unigrams and bigrams, Laplace-smoothed."""
+
+    def __init__(self, alpha: float = 1.0):
+        self.alpha = alpha
+        self._log_prior = {}
+        self._log_likelihood = {}
+        self._log_unseen = {}
+        self._vocabulary = set()
+
+    @staticmethod
+    def features(text: str) -> list:
+        words = _WORD_RE.findall(normalize(text))
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    def fit(self, examples) -> "NaiveBayesIntentClassifier":
+        counts = defaultdict(Counter)
+        docs = Counter()
+        for text, intent in examples:
+            counts[intent].update(self.features(text))
+            docs[intent] += 1
+        self._vocabulary = set().union(*counts.values())
+        total_docs = sum(docs.values())
+        for intent, feature_counts in counts.items():
+            denominator = sum(feature_counts.values()) + self.alpha * len(self._vocabulary)
+            self._log_prior[intent] = math.log(docs[intent] / total_docs)
+            self._log_likelihood[intent] = {
+                f: math.log((n + self.alpha) / denominator) for f, n in feature_counts.items()
+            }
+            self._log_unseen[intent] = math.log(self.alpha / denominator)
+        return self
+
+    def predict(self, text: str):
+        """(intent, posterior probability); (None, 0.0) if no feature was seen in training."""
+        known = [f for f in self.features(text) if f in self._vocabulary]
+        if not known:
+            return None, 0.0
+        scores = {
+            intent: prior + sum(self._log_likelihood[intent].get(f, self._log_unseen[intent]) for f in known)
+            for intent, prior in self._log_prior.items()
+        }
+        best = max(scores, key=scores.get)
+        total = sum(math.exp(s - scores[best]) for s in scores.values())
+        return best, 1.0 / total
+
+
+class IntentRouter:
+    """Keyword rules first, then (optionally) the classifier if it is confident enough."""
+
+    def __init__(self, classifier: NaiveBayesIntentClassifier = None, threshold: float = 0.9):
+        self.classifier = classifier
+        self.threshold = threshold
+
+    def route(self, text: str):
+        """(intent, source) with source "rule" or "classifier"; (None, "llm") when unsure."""
+        intent = match_rules(text)
+        if intent:
+            return intent, "rule"
+        if self.classifier and not SMALL_TALK_RE.search(normalize(text)):
+            intent, probability = self.classifier.predict(text)
+            if intent and probability >= self.threshold:
+                return intent, "classifier"
+        return None, "llm"
+
+
+class RouterStats:
+    """Per-route hit counts, plus the LLM calls and time the fast routes avoided.
+
+    Time saved is estimated from the fallback path: every routed request is
+    credited with the mean observed duration of the LLM steps its route
+    skips (`skipped_steps`: route -> step names). Steps never observed
+    count as zero, so the estimate is a lower bound until the fallback has
+    run a few times.
+    """
+
+    def __init__(self, skipped_steps: dict):
+        self.skipped_steps = skipped_steps
+        self.hits = Counter()
+        self.sources = Counter()
+        self._elapsed = defaultdict(float)
+        self._step_total = defaultdict(float)
+        self._step_count = Counter()
+
+    def record(self, route: str, source: str, elapsed_s: float) -> None:
+        self.hits[route] += 1
+        self.sources[source] += 1
+        self._elapsed[route] += elapsed_s
+
+    def observe_step(self, step: str, seconds: float) -> None:
+        self._step_total[step] += seconds
+        self._step_count[step] += 1
+
+    def step_mean(self, step: str) -> float:
+        return self._step_total[step] / self._step_count[step] if self._step_count[step] else 0.0
+
+    def snapshot(self) -> dict:
+        total = sum(self.hits.values())
+        routes = {}
+        for route, hits in sorted(self.hits.items()):
+            skipped = self.skipped_steps.get(route, ())
+            routes[route] = {
+                "hits": hits,
+                "hit_rate": hits / total,
+                "mean_ms": self._elapsed[route] / hits * 1000,
+                "llm_calls_saved": hits * len(skipped),
+                "saved_ms": hits * sum(self.step_mean(step) for step in skipped) * 1000,
+            }
+        return {
+            "requests": total,
+            "by_source": dict(self.sources),
+            "routes": routes,
+            "llm_calls_saved": sum(r["llm_calls_saved"] for r in routes.values()),
+            "saved_ms": sum(r["saved_ms"] for r in routes.values()),
+        }
@@ -0,0 +1,254 @@
+import asyncio
+import contextvars
+import os
+import threading
+import time
+import weakref
+
+import httpx
+import litellm
+from google.adk.models.lite_llm import LiteLlm, LiteLLMClient
+from litellm.llms.custom_httpx.http_handler import AsyncHTTPHandler
+
+# Requests per minute and burst size when LLM_RATE_LIMITS doesn't say otherwise
+DEFAULT_RATE_LIMITS = {"anthropic": (50, 5)}
+# Providers litellm calls through an SDK client rather than its own httpx handler;
+# they keep litellm's cached SDK client and only get the rate limiter
+SDK_CLIENT_PROVIDERS = {"openai", "azure"}
+# Set by PooledLiteLlm when it has already awaited the rate-limit token for the
+# blocking completion() call LiteLlm makes next
+_token_prepaid = contextvars.ContextVar("token_prepaid", default=False)
+
+
+def parse_rate_limits(spec: str) -> dict:
+    """'anthropic=50:5,openai=500' -> {provider: (requests per minute, burst)}; burst defaults to rpm/10."""
+    limits = {}
+    for item in filter(None, (part.strip() for part in (spec or "").split(","))):
+        provider, _, value = item.partition("=")
+        rpm, _, burst = value.partition(":")
+        limits[provider.strip()] = (float(rpm), int(burst) if burst else max(1, int(float(rpm) // 10)))
+    return limits
+
+
+def provider_of(model: str) -> str:
+    try:
+        return litellm.get_llm_provider(model)[1]
+    except Exception:
+        return model.split("/", 1)[0] if "/" in model else "default"
+
+
+class TokenBucket:
+    """Token bucket that queues callers instead of rejecting them.
+
+    Each acquire() reserves the next token under a thread lock and sleeps
+    until it is due, so waiters are served in arrival order and the bucket
+    works from any thread or event loop. A caller cancelled while waiting
+    gives its token back.
+    """
+
+    def __init__(self, rate_per_s: float, capacity: int):
+        self.rate = rate_per_s
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.requests = 0
+        self.waited_s = 0.0
+
+    def _reserve(self) -> float:
+        """Takes the next token (going into debt if needed); returns how long until it is due."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            self.requests += 1
+            self.waited_s += wait
+            if wait:
+                self.queue_depth += 1
+                self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+            return wait
+
+    def _release(self, cancelled: bool = False) -> None:
+        with self._lock:
+            self.queue_depth -= 1
+            if cancelled:
+                self._tokens += 1
+
+    async def acquire(self) -> float:
+        """Waits for a token; returns the seconds spent waiting."""
+        wait = self._reserve()
+        if wait:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                self._release(cancelled=True)
+                raise
+            self._release()
+        return wait
+
+    def acquire_sync(self) -> float:
+        """Blocking acquire() for threads without an event loop; never call it on the loop."""
+        wait = self._reserve()
+        if wait:
+            time.sleep(wait)
+            self._release()
+        return wait
+
+    def try_acquire(self) -> bool:
+        """Takes a token only if one is free right now (never waits or goes into debt)."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            self.requests += 1
+            return True
+
+
+class PooledLiteLLMClient(LiteLLMClient):
+    """LiteLLMClient that waits for its provider's rate limit and reuses the provider's pooled HTTP client."""
+
+    def __init__(self, registry: "ModelRegistry", provider: str):
+        self._registry = registry
+        self._provider = provider
+
+    @property
+    def limiter(self):
+        return self._registry.limiter(self._provider)
+
+    async def acompletion(self, model, messages, tools, **kwargs):
+        limiter = self.limiter
+        if limiter:
+            await limiter.acquire()
+        if self._provider not in SDK_CLIENT_PROVIDERS:
+            kwargs.setdefault("client", self._registry.http_client(self._provider))
+        return await super().acompletion(model, messages, tools, **kwargs)
+
+    def completion(self, model, messages, tools, stream=False, **kwargs):
+        # LiteLlm streams through the sync API; litellm's cached sync client serves it
+        limiter = self.limiter
+        if _token_prepaid.get():
+            _token_prepaid.set(False)
+        elif limiter:
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                limiter.acquire_sync()
+            else:
+                # Sleeping here would stall the event loop, so over the limit fails like a 429
+                if not limiter.try_acquire():
+                    raise litellm.RateLimitError(
+                        message=f"client-side rate limit for {self._provider}",
+                        llm_provider=self._provider,
+                        model=model,
+                    )
+        return super().completion(model, messages, tools, stream=stream, **kwargs)
+
+
+class PooledLiteLlm(LiteLlm):
+    """LiteLlm whose streaming calls wait for the rate limit without blocking the loop.
+
+    LiteLlm streams through the blocking llm_client.completion(), so the token
+    is awaited here first and the client's completion() skips its own wait.
+    """
+
+    async def generate_content_async(self, llm_request, stream: bool = False):
+        limiter = getattr(self.llm_client, "limiter", None)
+        if stream and limiter:
+            await limiter.acquire()
+            _token_prepaid.set(True)
+        try:
+            async for response in super().generate_content_async(llm_request, stream=stream):
+                yield response
+        finally:
+            _token_prepaid.set(False)
+
+
+class ModelRegistry:
+    """Process-wide LiteLlm instances, one per model, with shared per-provider plumbing.
+
+    - agents asking for the same model (and arguments) get the same LiteLlm
+    - each provider gets one pooled keep-alive HTTP client per event loop
+      (httpx connections can't cross loops), sized by `max_connections`
+    - each provider with a rate limit gets one TokenBucket, so bursts queue
+      behind it instead of coming back as 429s; stats() reports the queue depth
+    """
+
+    def __init__(self, rate_limits: dict = None, max_connections: int = 100, timeout: float = 600.0):
+        self.rate_limits = DEFAULT_RATE_LIMITS if rate_limits is None else rate_limits
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._models = {}
+        self._limiters = {
+            provider: TokenBucket(rpm / 60.0, burst) for provider, (rpm, burst) in self.rate_limits.items()
+        }
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ModelRegistry":
+        """LLM_RATE_LIMITS (e.g. 'anthropic=50:5'; empty disables limits) and LLM_MAX_CONNECTIONS."""
+        spec = os.getenv("LLM_RATE_LIMITS")
+        return cls(
+            rate_limits=parse_rate_limits(spec) if spec is not None else None,
+            max_connections=int(os.getenv("LLM_MAX_CONNECTIONS", "100")),
+        )
+
+    def get(self, model: str, **litellm_args) -> LiteLlm:
+        """The shared LiteLlm for `model`; extra arguments (api_base, temperature, ...) are part of the key."""
+        key = (model, tuple(sorted((k, repr(v)) for k, v in litellm_args.items())))
+        with self._lock:
+            if key not in self._models:
+                client = PooledLiteLLMClient(self, provider_of(model))
+                self._models[key] = PooledLiteLlm(model=model, llm_client=client, **litellm_args)
+            return self._models[key]
+
+    def limiter(self, provider: str):
+        return self._limiters.get(provider)
+
+    def http_client(self, provider: str) -> AsyncHTTPHandler:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients = self._clients.setdefault(provider, weakref.WeakKeyDictionary())
+            if loop not in clients:
+                clients[loop] = AsyncHTTPHandler(
+                    timeout=httpx.Timeout(self.timeout, connect=5.0),
+                    concurrent_limit=self.max_connections,
+                )
+            return clients[loop]
+
+    def queue_depth(self, provider: str = None) -> int:
+        """Requests currently waiting for a rate-limit token (for one provider, or all)."""
+        if provider:
+            limiter = self._limiters.get(provider)
+            return limiter.queue_depth if limiter else 0
+        return sum(limiter.queue_depth for limiter in self._limiters.values())
+
+    def stats(self) -> dict:
+        return {
+            "models": sorted({model for model, _ in self._models}),
+            "http_clients": {provider: len(clients) for provider, clients in self._clients.items()},
+            "rate_limits": {
+                provider: {
+                    "queue_depth": limiter.queue_depth,
+                    "max_queue_depth": limiter.max_queue_depth,
+                    "requests": limiter.requests,
+                    "mean_wait_ms": limiter.waited_s / limiter.requests * 1000 if limiter.requests else 0.0,
+                }
+                for provider, limiter in self._limiters.items()
+            },
+        }
+
+    async def aclose(self) -> None:
+        """Closes the HTTP clients created on the running loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients = [c.pop(loop) for c in self._clients.values() if loop in c]
+        for client in clients:
+            await client.close()
@@ -1,11 +1,19 @@
+import re
+from typing import Optional
 from dotenv import load_dotenv
 load_dotenv()
+from pydantic import BaseModel, Field
 from google.adk.agents import LlmAgent
 from google.adk.runners import Runner
 from google.adk.sessions import InMemorySessionService
 MODEL_NAME = "gemini-2.0-flash"
 from google.genai import types
 
+try:
+    from .product_index import ProductIndex, compile_brand_matcher
+except ImportError:
+    from product_index import ProductIndex, compile_brand_matcher
+
 MY_LLM_MODEL = "gemini-2.0-flash"
 
 # A mock product database (each product has a name, brand, price, and category/use-case tag)
@@ -19,6 +27,7 @@ PRODUCT_DB = [
     {"name": "Ultrabook Air", "brand": "Apple", "price": 1200, "category": "office",
      "description": "premium ultrabook with sleek design, ideal for business and travel"}
 ]
+PRODUCT_INDEX = ProductIndex(PRODUCT_DB)
 
 # Sub-agent to extract budget
 budget_agent = LlmAgent(
@@ -38,6 +47,73 @@ use_case_agent = LlmAgent(
     output_key="use_case"
 )
 
+# Budget, use case and brand in one schema-validated extraction (replaces the two agents above)
+class ShoppingCriteria(BaseModel):
+    budget: Optional[float] = Field(None, description="Maximum budget in USD")
+    use_case: Optional[str] = Field(None, description="Primary use: gaming, office, school, video editing, ...")
+    brand: Optional[str] = Field(None, description="Preferred laptop brand, if the user names one")
+
+criteria_agent = LlmAgent(
+    name="CriteriaAgent",
+    model=MY_LLM_MODEL,
+    description="Extracts the user's budget, use case and brand preference from the request.",
+    instruction=(
+        "Extract the user's laptop shopping criteria from the query.\n"
+        "budget: the budget in USD as a number. If the user says 'under $X' or 'X dollars' use X; "
+        "for words like 'cheap' or 'affordable' use an approximate number.\n"
+        "use_case: a single category such as 'gaming', 'office', 'school' or 'video editing'.\n"
+        "brand: the laptop brand the user asks for.\n"
+        "Use null for anything the user does not mention."
+    ),
+    output_schema=ShoppingCriteria,
+    output_key="criteria",
+    disallow_transfer_to_parent=True,
+    disallow_transfer_to_peers=True
+)
+
+KNOWN_BRANDS = ["Dell", "Apple", "HP", "Lenovo", "Asus", "Acer", "Alienware"]
+match_brand = compile_brand_matcher(KNOWN_BRANDS)
+USE_CASE_KEYWORDS = {
+    "gaming": ["gaming", "gamer", "games", "game"],
+    "office": ["office", "work", "business", "productivity", "spreadsheets"],
+    "school": ["school", "student", "college", "university", "homework"],
+    "video editing": ["video editing", "edit videos", "editing videos", "premiere"],
+}
+# Budget assumed for 'cheap' / 'affordable' when no amount is given
+CHEAP_BUDGET = 800.0
+
+_AMOUNT_RE = re.compile(
+    r"\$\s*(\d[\d,]*(?:\.\d+)?)\s*(k\b)?|\b(\d[\d,]*(?:\.\d+)?)\s*(k\b)?\s*(?:dollars|usd|bucks)\b",
+    re.IGNORECASE
+)
+_CHEAP_RE = re.compile(r"\b(cheap|affordable|inexpensive|low[- ]cost)\b", re.IGNORECASE)
+
+def parse_criteria(query: str) -> ShoppingCriteria:
+    """
+    Heuristic pre-parser for the obvious cases:
+    - budget from amounts like 'under $1000', '$1.2k' or '900 dollars' (the largest one),
+      or CHEAP_BUDGET for words like 'cheap'
+    - use case when the query names exactly one known category
+    - brand from the known brand list
+    Fields it cannot settle stay None.
+    """
+    amounts = []
+    for match in _AMOUNT_RE.finditer(query):
+        number, k = (match.group(1), match.group(2)) if match.group(1) else (match.group(3), match.group(4))
+        amounts.append(float(number.replace(",", "")) * (1000 if k else 1))
+    budget = max(amounts) if amounts else (CHEAP_BUDGET if _CHEAP_RE.search(query) else None)
+
+    lowered = query.lower()
+    use_cases = [
+        use_case for use_case, keywords in USE_CASE_KEYWORDS.items()
+        if any(re.search(rf"\b{re.escape(k)}\b", lowered) for k in keywords)
+    ]
+    return ShoppingCriteria(
+        budget=budget,
+        use_case=use_cases[0] if len(use_cases) == 1 else None,
+        brand=match_brand(query)
+    )
+
 # Sub-agent to compose the final recommendation message
 final_answer_agent = LlmAgent(
     name="FinalAnswerAgent",
@@ -55,34 +131,107 @@ final_answer_agent = LlmAgent(
     output_key="final_answer"
 )
 
+import asyncio
 from google.adk.agents import BaseAgent
+from google.adk.events import Event, EventActions
+
+_DONE = object()
 
 class ProductRecommendationAgent(BaseAgent):
-    
-    def __init__(self, budget_agent, use_case_agent, final_agent):
+    # "structured": pre-parser, then at most one CriteriaAgent call for whatever it missed
+    # "split": separate BudgetAgent and UseCaseAgent calls (run concurrently by default)
+    extraction: str = "structured"
+    # Run the independent extraction agents (budget, use case) at the same time
+    concurrent_extraction: bool = True
+
+    def __init__(self, budget_agent, use_case_agent, final_agent, criteria_agent,
+                 extraction: str = "structured", concurrent_extraction: bool = True):
         super().__init__(
             name="ProductRecommendationAgent",
-            sub_agents=[budget_agent, use_case_agent, final_agent]
+            sub_agents=[budget_agent, use_case_agent, final_agent, criteria_agent],
+            extraction=extraction,
+            concurrent_extraction=concurrent_extraction
+        )
+
+    async def _run_concurrently(self, ctx, agents):
+        """
+        Runs independent sub-agents at once and yields their events grouped per agent, in list order:
+        - the first agent's events stream through as they arrive; later agents' events are buffered
+          until every agent before them has finished, so the event order (and the order in which
+          the runner applies their state_delta writes) is the same as a sequential run
+        - each agent runs on its own branch, so none sees the others' in-progress output
+        """
+        queues = [asyncio.Queue() for _ in agents]
+
+        async def drain(agent, queue):
+            branch = f"{ctx.branch}.{self.name}.{agent.name}" if ctx.branch else f"{self.name}.{agent.name}"
+            try:
+                async for event in agent.run_async(ctx.model_copy(update={"branch": branch})):
+                    await queue.put(event)
+                await queue.put(_DONE)
+            except Exception as e:
+                await queue.put(e)
+
+        tasks = [asyncio.create_task(drain(agent, queue)) for agent, queue in zip(agents, queues)]
+        try:
+            for queue in queues:
+                while (item := await queue.get()) is not _DONE:
+                    if isinstance(item, Exception):
+                        raise item
+                    yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _extract_split(self, ctx, user_query: str):
+        """Budget and use case from one LLM call each; brand by keyword match."""
+        # BudgetAgent and UseCaseAgent write separate state keys and don't read each other's output
+        extraction_agents = [self.find_sub_agent("BudgetAgent"), self.find_sub_agent("UseCaseAgent")]
+        if self.concurrent_extraction:
+            async for event in self._run_concurrently(ctx, extraction_agents):
+                yield event
+        else:
+            for agent in extraction_agents:
+                async for event in agent.run_async(ctx):
+                    yield event
+
+        # Determine brand preference using deterministic logic
+        ctx.session.state["brand"] = match_brand(user_query) or "None"
+
+    async def _extract_structured(self, ctx, user_query: str):
+        """Budget, use case and brand from the pre-parser, calling CriteriaAgent only for missing fields."""
+        criteria = parse_criteria(user_query)
+        if criteria.budget is None or criteria.use_case is None:
+            async for event in self.find_sub_agent("CriteriaAgent").run_async(ctx):
+                yield event
+            extracted = ShoppingCriteria(**(ctx.session.state.get("criteria") or {}))
+            # Values the pre-parser found win over the model's reading
+            criteria = ShoppingCriteria(
+                budget=criteria.budget if criteria.budget is not None else extracted.budget,
+                use_case=criteria.use_case or extracted.use_case,
+                brand=criteria.brand or extracted.brand
+            )
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta={
+                "budget": f"{criteria.budget:g}" if criteria.budget is not None else "not specified",
+                "use_case": criteria.use_case or "",
+                "brand": criteria.brand or "None",
+            })
         )
 
     async def _run_async_impl(self, ctx):
         """Orchestrates the sub-agents and decision logic to produce a product recommendation."""
-        # Step 1: Run the BudgetAgent to get the budget
-        async for event in self.sub_agents[0].run_async(ctx):
-            yield event
-        # Step 2: Run the UseCaseAgent to get the use case
-        async for event in self.sub_agents[1].run_async(ctx):
-            yield event
-
-        # Step 3: Determine brand preference using deterministic logic
+        # Steps 1-3: Get the budget, use case and brand preference into state
         user_query = ctx.user_content.parts[0].text
-        known_brands = ["Dell", "Apple", "HP", "Lenovo", "Asus", "Acer", "Alienware"]
-        brand = None
-        for b in known_brands:
-            if b.lower() in user_query.lower():
-                brand = b
-                break
-        ctx.session.state["brand"] = brand if brand else "None"
+        extract = self._extract_structured if self.extraction == "structured" else self._extract_split
+        async for event in extract(ctx, user_query):
+            yield event
+        brand = ctx.session.state.get("brand")
+        brand = None if brand in (None, "None") else brand
 
         # Retrieve the parsed budget and use_case from state
         budget_str = ctx.session.state.get("budget")
@@ -92,31 +241,9 @@ class ProductRecommendationAgent(BaseAgent):
         except ValueError:
             budget_val = None
 
-        # Step 4: Filter the product database based on criteria
-        candidates = []
-        for product in PRODUCT_DB:
-            if budget_val is not None and product["price"] > budget_val:
-                continue
-            if use_case and product["category"].lower() != use_case.lower():
-                continue
-            if brand and product["brand"].lower() != brand.lower():
-                continue
-            candidates.append(product)
-
-        # Fallback: Relax use_case filter if no candidates found
-        if not candidates:
-            for product in PRODUCT_DB:
-                if budget_val is not None and product["price"] > budget_val:
-                    continue
-                if brand and product["brand"].lower() != brand.lower():
-                    continue
-                candidates.append(product)
-
-        # Choose one product to recommend
-        if candidates:
-            selected_product = max(candidates, key=lambda p: p["price"])
-        else:
-            selected_product = None
+        # Step 4: Pick the priciest product within budget for the use case and brand,
+        # relaxing the use case if nothing matches
+        selected_product = PRODUCT_INDEX.best(budget_val, use_case, brand)
 
         # Step 5: Prepare information for the FinalAnswerAgent
         if selected_product:
@@ -129,11 +256,11 @@ class ProductRecommendationAgent(BaseAgent):
             ctx.session.state["product_description"] = ""
 
         # Step 6: Run the FinalAnswerAgent to generate the output message
-        async for event in self.sub_agents[2].run_async(ctx):
+        async for event in self.find_sub_agent("FinalAnswerAgent").run_async(ctx):
             yield event
 
 # Instantiate the agent with the sub-agents
-recommendation_agent = ProductRecommendationAgent(budget_agent, use_case_agent, final_answer_agent)
+recommendation_agent = ProductRecommendationAgent(budget_agent, use_case_agent, final_answer_agent, criteria_agent)
 root_agent = recommendation_agent
 
 if __name__ == "__main__":
@@ -157,7 +284,7 @@ if __name__ == "__main__":
             events = runner.run(user_id=USER_ID, session_id=SESSION_ID, new_message=content)
             # Debugging: Print all events to inspect their structure
             for event in events:
-                print(f"DEBUG: Event - is_final_response: {hasattr(event, 'is_final_response') and event.is_final_response()}, Content: {event.content.parts[0].text if event.content.parts else 'No content'}")
+                print(f"DEBUG: Event - is_final_response: {hasattr(event, 'is_final_response') and event.is_final_response()}, Content: {event.content.parts[0].text if event.content and event.content.parts else 'No content'}")
                 # Only print the final response from the FinalAnswerAgent
                 if hasattr(event, 'is_final_response') and event.is_final_response():
                     final_text = event.content.parts[0].text
@@ -0,0 +1,105 @@
+"""LLM calls and latency per recommendation for each extraction mode.
+
+Compares the two-agent extraction (BudgetAgent + UseCaseAgent, run one
+after the other or concurrently) with the structured path (regex
+pre-parser, then one CriteriaAgent call only for what it missed). Every
+LlmAgent runs on a stub model that answers after a fixed delay, and the
+queries mix obvious, partial and vague phrasings:
+
+    python order_notebook/bench_extraction.py --latency 0.5 --runs 3
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from google.adk.models import BaseLlm
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from agent import recommendation_agent
+
+# (query, expected budget, use_case, brand) as the stub model would read them
+QUERIES = [
+    ("I need a Dell gaming laptop under $1000", 1000, "gaming", "Dell"),
+    ("Looking for a cheap laptop for school", 800, "school", None),
+    ("office laptop, budget 1.5k dollars", 1500, "office", None),
+    ("Apple laptop for work, max $1,300", 1300, "office", "Apple"),
+    ("Best gaming rig around $2000 please", 2000, "gaming", None),
+    ("Something for my daughter to play Fortnite, under $900", 900, "gaming", None),
+    ("A laptop for spreadsheets and gaming, nothing over $1200", 1200, "gaming", None),
+    ("What would you recommend for a new job? Money is no object", None, "office", None),
+]
+
+
+class StubLlm(BaseLlm):
+    """Answers each extraction prompt from the expected values after `latency` seconds."""
+    model: str = "stub-llm"
+    latency: float = 0.5
+    calls: int = 0
+
+    async def generate_content_async(self, llm_request, stream: bool = False):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        instruction = str(llm_request.config.system_instruction or "")
+        query = llm_request.contents[0].parts[0].text
+        _, budget, use_case, brand = next(q for q in QUERIES if q[0] == query)
+        if "shopping criteria" in instruction:
+            text = json.dumps({"budget": budget, "use_case": use_case, "brand": brand})
+        elif "budget in USD" in instruction:
+            text = str(budget) if budget is not None else "not specified"
+        elif "primarily be used" in instruction:
+            text = use_case
+        else:
+            # Echo the product the agent picked, as filled into the final prompt
+            text = next((line for line in instruction.splitlines() if line.startswith("Recommended Product")), "")
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=text)]))
+
+
+async def run_once(query: str, session_id: str):
+    session_service = InMemorySessionService()
+    runner = Runner(agent=recommendation_agent, app_name="bench", session_service=session_service)
+    await session_service.create_session(app_name="bench", user_id="u", session_id=session_id)
+    message = types.Content(role="user", parts=[types.Part(text=query)])
+    start = time.perf_counter()
+    answer = ""
+    async for event in runner.run_async(user_id="u", session_id=session_id, new_message=message):
+        if event.author == "FinalAnswerAgent" and event.content:
+            answer = event.content.parts[0].text
+    return time.perf_counter() - start, answer
+
+
+async def bench(args):
+    llm = StubLlm(latency=args.latency)
+    for sub_agent in recommendation_agent.sub_agents:
+        sub_agent.model = llm
+    modes = (("split-sequential", "split", False), ("split-concurrent", "split", True),
+             ("structured", "structured", True))
+    picks = {}
+    print(f"{'extraction':<18}{'p50 ms':>8}{'max ms':>8}{'LLM calls/req':>15}")
+    for label, extraction, concurrent in modes:
+        recommendation_agent.extraction = extraction
+        recommendation_agent.concurrent_extraction = concurrent
+        before = llm.calls
+        times, picks[label] = [], []
+        for run in range(args.runs):
+            for i, (query, *_) in enumerate(QUERIES):
+                elapsed, product = await run_once(query, f"{label}-{run}-{i}")
+                times.append(elapsed)
+                if run == 0:
+                    picks[label].append(product)
+        requests = args.runs * len(QUERIES)
+        print(f"{label:<18}{statistics.median(times) * 1000:>8.0f}{max(times) * 1000:>8.0f}"
+              f"{(llm.calls - before) / requests:>15.2f}")
+    assert len({tuple(p) for p in picks.values()}) == 1, f"modes picked different products: {picks}"
+    print("all modes picked the same products:", picks["structured"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.5, help="stub LLM seconds per call")
+    parser.add_argument("--runs", type=int, default=3)
+    asyncio.run(bench(parser.parse_args()))
@@ -0,0 +1,122 @@
+"""Product selection benchmark: ProductIndex vs the original two-pass scan.
+
+Builds a synthetic laptop catalog, then times "priciest laptop within
+budget for this use case and brand" queries (some with unknown use
+cases, to exercise the relaxed fallback) and brand detection, checking
+that every answer matches the original logic:
+
+    python order_notebook/bench_index.py --size 1000000
+"""
+import argparse
+import random
+import time
+
+from product_index import ProductIndex, compile_brand_matcher
+
+BRANDS = ["Dell", "Apple", "HP", "Lenovo", "Asus", "Acer", "Alienware", "MSI", "Razer", "Samsung"]
+CATEGORIES = ["gaming", "office", "school", "video editing", "workstation", "travel"]
+# Use cases with no products, so the use-case filter has to be relaxed
+UNKNOWN_USE_CASES = ["music production", "programming"]
+
+
+def make_laptops(n: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    return [
+        {
+            "name": f"Model {i}",
+            "brand": rng.choice(BRANDS),
+            # Whole tens, so equal prices (and the tie-break) are common
+            "price": rng.randrange(300, 4000, 10),
+            "category": rng.choice(CATEGORIES),
+            "description": "",
+        }
+        for i in range(n)
+    ]
+
+
+def make_queries(n: int, seed: int = 1) -> list:
+    rng = random.Random(seed)
+    return [
+        (
+            rng.choice([None, rng.randrange(250, 4500)]),
+            rng.choice(CATEGORIES + UNKNOWN_USE_CASES + [None]),
+            rng.choice(BRANDS + [None, None, None]),
+        )
+        for _ in range(n)
+    ]
+
+
+def linear_best(products: list, budget, use_case, brand):
+    """The original step 4: filter the catalog, rescan without the use case if empty, take the max price."""
+    candidates = []
+    for product in products:
+        if budget is not None and product["price"] > budget:
+            continue
+        if use_case and product["category"].lower() != use_case.lower():
+            continue
+        if brand and product["brand"].lower() != brand.lower():
+            continue
+        candidates.append(product)
+    if not candidates:
+        for product in products:
+            if budget is not None and product["price"] > budget:
+                continue
+            if brand and product["brand"].lower() != brand.lower():
+                continue
+            candidates.append(product)
+    return max(candidates, key=lambda p: p["price"]) if candidates else None
+
+
+def linear_brand(text: str):
+    for b in BRANDS:
+        if b.lower() in text.lower():
+            return b
+    return None
+
+
+def per_call_us(fn, items) -> float:
+    start = time.perf_counter()
+    for item in items:
+        fn(*item)
+    return (time.perf_counter() - start) / len(items) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=1_000_000, help="laptops in the catalog")
+    parser.add_argument("--scan-queries", type=int, default=20, help="queries timed on the linear scan")
+    parser.add_argument("--queries", type=int, default=200_000, help="queries timed on the index")
+    args = parser.parse_args()
+
+    laptops = make_laptops(args.size)
+    start = time.perf_counter()
+    index = ProductIndex(laptops)
+    print(f"catalog: {len(index):,} laptops, index built in {time.perf_counter() - start:.2f} s")
+
+    queries = make_queries(args.queries)
+    scan_queries = queries[:args.scan_queries]
+    for q in scan_queries:
+        assert index.best(*q) is linear_best(laptops, *q), f"mismatch for {q}"
+    scan = per_call_us(lambda *q: linear_best(laptops, *q), scan_queries)
+    indexed = per_call_us(index.best, queries)
+    print(f"{'selection':<14}{'us/query':>12}")
+    print(f"{'linear scan':<14}{scan:>12,.1f}")
+    relaxed = sum(1 for q in scan_queries if q[1] in UNKNOWN_USE_CASES)
+    print(f"{'index':<14}{indexed:>12,.1f}   ({scan / indexed:,.0f}x; {len(scan_queries)} answers identical, "
+          f"{relaxed} via the relaxed fallback)")
+
+    match_brand = compile_brand_matcher(BRANDS)
+    rng = random.Random(2)
+    texts = [(f"I want a {rng.choice(BRANDS + ['good', 'new'])} laptop for {rng.choice(CATEGORIES)} under $1500",)
+             for _ in range(100_000)]
+    assert all(match_brand(t) == linear_brand(t) for (t,) in texts)
+    print(f"{'brand match':<14}{'us/query':>12}")
+    print(f"{'loop of in':<14}{per_call_us(linear_brand, texts):>12,.2f}")
+    print(f"{'compiled':<14}{per_call_us(match_brand, texts):>12,.2f}")
+    # Whole-word matching: the old substring check reads "HP" in "PHP"
+    text = "a laptop for PHP development"
+    print(f"{text!r}: loop={linear_brand(text)} compiled={match_brand(text)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Time-to-recommendation with sequential vs concurrent budget/use-case extraction.
+
+Every LlmAgent runs on a stub model that answers after a fixed delay, so
+the difference is the number of LLM round trips on the critical path. The
+check also confirms both modes emit events in the same order and end with
+the same session state:
+
+    python order_notebook/bench_parallel.py --latency 0.5 --runs 5
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from google.adk.models import BaseLlm
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from agent import recommendation_agent
+
+QUERY = "I need a Dell gaming laptop under $1000"
+
+
+class StubLlm(BaseLlm):
+    """Answers each extraction prompt with a canned value after `latency` seconds."""
+    model: str = "stub-llm"
+    latency: float = 0.5
+    calls: int = 0
+
+    async def generate_content_async(self, llm_request, stream: bool = False):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        instruction = str(llm_request.config.system_instruction or "")
+        if "budget in USD" in instruction:
+            text = "1000"
+        elif "primarily be used" in instruction:
+            text = "gaming"
+        else:
+            text = "The Dell Budget Gamer 3000 fits your budget."
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=text)]))
+
+
+async def run_once(concurrent: bool, session_id: str):
+    recommendation_agent.extraction = "split"
+    recommendation_agent.concurrent_extraction = concurrent
+    session_service = InMemorySessionService()
+    runner = Runner(agent=recommendation_agent, app_name="bench", session_service=session_service)
+    await session_service.create_session(app_name="bench", user_id="u", session_id=session_id)
+    message = types.Content(role="user", parts=[types.Part(text=QUERY)])
+    authors = []
+    start = time.perf_counter()
+    async for event in runner.run_async(user_id="u", session_id=session_id, new_message=message):
+        authors.append(event.author)
+    elapsed = time.perf_counter() - start
+    session = await session_service.get_session(app_name="bench", user_id="u", session_id=session_id)
+    return elapsed, authors, dict(session.state)
+
+
+async def bench(args):
+    llm = StubLlm(latency=args.latency)
+    for sub_agent in recommendation_agent.sub_agents:
+        sub_agent.model = llm
+    results = {}
+    print(f"{'extraction':<12}{'p50 ms':>8}{'LLM calls':>11}  event order")
+    for label, concurrent in (("sequential", False), ("concurrent", True)):
+        before = llm.calls
+        runs = [await run_once(concurrent, f"{label}-{i}") for i in range(args.runs)]
+        p50 = statistics.median(r[0] for r in runs)
+        results[label] = runs[-1]
+        orders = {tuple(r[1]) for r in runs}
+        assert len(orders) == 1, f"{label}: event order varies between runs"
+        print(f"{label:<12}{p50 * 1000:>8.0f}{(llm.calls - before) / args.runs:>11.1f}  {' > '.join(runs[-1][1])}")
+    assert results["sequential"][1] == results["concurrent"][1], "event order differs"
+    assert results["sequential"][2] == results["concurrent"][2], "final state differs"
+    print("same event order and final state:", results["concurrent"][2])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.5, help="stub LLM seconds per call")
+    parser.add_argument("--runs", type=int, default=5)
+    asyncio.run(bench(parser.parse_args()))
@@ -0,0 +1,69 @@
+import re
+from array import array
+from bisect import bisect_right
+from collections import defaultdict
+
+
+def compile_brand_matcher(brands):
+    """Returns match(text) -> the first of `brands` named in text (whole word, any case), or None."""
+    canonical = {b.casefold(): b for b in brands}
+    # Longest first so a brand that prefixes another can't shadow it
+    alternatives = "|".join(re.escape(b) for b in sorted(canonical, key=len, reverse=True))
+    pattern = re.compile(rf"\b({alternatives})\b")
+
+    def match(text: str):
+        found = pattern.search(text.casefold())
+        return canonical[found.group(1)] if found else None
+    return match
+
+
+class ProductIndex:
+    """Product catalog indexed for "most expensive product within budget" lookups.
+
+    - one price-sorted posting list per (category, brand), per category,
+      per brand and for the whole catalog, built with a single sort
+    - best() is a binary search in the narrowest list that applies; the
+      relaxed fallback (drop the use case, keep the brand) is one more
+      binary search instead of a second scan
+
+    Category and brand keys are case-folded once at build time.
+    """
+
+    def __init__(self, products=()):
+        self.products = list(products)
+        prices = [float(p["price"]) for p in self.products]
+        # Ascending price; among equal prices the earliest product sorts last, so a
+        # bisect picks it, same as max() over the catalog in order
+        order = sorted(range(len(self.products)), key=lambda pos: (prices[pos], -pos))
+        self._positions = defaultdict(lambda: array("i"))
+        self._prices = defaultdict(lambda: array("d"))
+        for pos in order:
+            category = self.products[pos]["category"].casefold()
+            brand = self.products[pos]["brand"].casefold()
+            for key in ((category, brand), (category, None), (None, brand), (None, None)):
+                self._positions[key].append(pos)
+                self._prices[key].append(prices[pos])
+        self._positions = dict(self._positions)
+        self._prices = dict(self._prices)
+
+    def __len__(self):
+        return len(self.products)
+
+    def _best(self, key, budget):
+        prices = self._prices.get(key)
+        if not prices:
+            return None
+        i = len(prices) if budget is None else bisect_right(prices, budget)
+        return self.products[self._positions[key][i - 1]] if i else None
+
+    def best(self, budget: float = None, use_case: str = None, brand: str = None):
+        """Most expensive product within budget for the use case and brand (None means any).
+
+        If nothing matches, the use case is dropped and the brand kept.
+        """
+        category = use_case.strip().casefold() if use_case and use_case.strip() else None
+        brand = brand.strip().casefold() if brand and brand.strip() else None
+        product = self._best((category, brand), budget)
+        if product is None and category is not None:
+            product = self._best((None, brand), budget)
+        return product
@@ -5,52 +5,110 @@ load_dotenv()
 from google.cloud import aiplatform
 from vertexai.preview.language_models import TextEmbeddingModel
 
+# Import retrieval helpers (support both package and script contexts)
+try:
+    from .chunker import iter_chunks
+    from .embedding import EmbeddingReport, embed_in_batches
+    from .embedding_cache import CachedEmbeddingModel
+    from .ivf_index import IVFIndex
+    from .mmap_store import MmapVectorIndex
+    from .vector_index import VectorIndex
+except ImportError:
+    from chunker import iter_chunks
+    from embedding import EmbeddingReport, embed_in_batches
+    from embedding_cache import CachedEmbeddingModel
+    from ivf_index import IVFIndex
+    from mmap_store import MmapVectorIndex
+    from vector_index import VectorIndex
+
 # Initialize embedding model (using Vertex AI Embedding API)
 # https://cloud.google.com/vertex-ai/generative-ai/docs/model-reference/text-embeddings-api#:~:text=Supported%20Models%3A
-embedding_model = TextEmbeddingModel.from_pretrained("text-embedding-005")
+EMBEDDING_MODEL_NAME = "text-embedding-005"
+# Repeated chunks and queries are served from a content-hash cache instead of
+# another API call; set SELF_RAG_EMBEDDING_CACHE to a file path to persist it.
+embedding_model = CachedEmbeddingModel(
+    TextEmbeddingModel.from_pretrained(EMBEDDING_MODEL_NAME),
+    model_name=EMBEDDING_MODEL_NAME,
+    disk_path=os.getenv("SELF_RAG_EMBEDDING_CACHE"),
+)
 
-# In-memory index to store document chunks and their vectors
-DOCUMENT_INDEX = []  # each entry: {"text": chunk_text, "vector": embedding_values}
+# Index to store document chunks and their (normalized) vectors.
+# Set SELF_RAG_INDEX_DIR to keep it on disk (memory-mapped) across restarts;
+# otherwise it lives in memory for the life of the process.
+# Set SELF_RAG_BACKEND=ivf for approximate search over large in-memory corpora;
+# the default exact scan is the reference implementation. The on-disk store is
+# exact-only, so SELF_RAG_INDEX_DIR can't be combined with SELF_RAG_BACKEND=ivf.
+INDEX_DIR = os.getenv("SELF_RAG_INDEX_DIR")
+RETRIEVAL_BACKEND = os.getenv("SELF_RAG_BACKEND", "exact")
+
+def make_document_index():
+    if INDEX_DIR:
+        if RETRIEVAL_BACKEND != "exact":
+            raise ValueError(
+                f"SELF_RAG_BACKEND={RETRIEVAL_BACKEND!r} is not supported with SELF_RAG_INDEX_DIR; "
+                "the on-disk index is exact-only (unset SELF_RAG_BACKEND or SELF_RAG_INDEX_DIR)"
+            )
+        return MmapVectorIndex(INDEX_DIR)
+    if RETRIEVAL_BACKEND == "ivf":
+        return IVFIndex(nprobe=int(os.getenv("SELF_RAG_NPROBE", "8")))
+    if RETRIEVAL_BACKEND == "exact":
+        return VectorIndex()
+    raise ValueError(f"Unknown SELF_RAG_BACKEND: {RETRIEVAL_BACKEND!r} (expected 'exact' or 'ivf')")
+
+DOCUMENT_INDEX = make_document_index()
+
+# Batch count and per-batch embedding latency of the most recent ingest_document call
+LAST_INGEST_REPORT = {}
+
+def _ingest_chunks(chunks) -> int:
+    """Embed a stream of chunks in batches and append them to the index; returns the chunk count."""
+    count = 0
+    # Embed the chunks in size-limited batches with a few requests in flight
+    report = EmbeddingReport()
+    for batch, vectors in embed_in_batches(embedding_model, chunks, report=report):
+        # Store the chunks and their vectors in the index
+        DOCUMENT_INDEX.add_many(batch, vectors)
+        count += len(batch)
+    LAST_INGEST_REPORT.clear()
+    LAST_INGEST_REPORT.update(report.summary())
+    return count
 
 def ingest_document(doc_text: str) -> str:
     """Ingest a legal document by splitting it into chunks, embedding them, and storing for retrieval."""
-    # Split the document text into chunks (e.g., by paragraphs)
-    chunks = [paragraph for paragraph in doc_text.split("\n\n") if paragraph.strip()]
-    # If very large paragraphs, further split or truncate (for simplicity, not shown here)
-
-    for chunk in chunks:
-        # Get embedding for the chunk
-        emb_response = embedding_model.get_embeddings([chunk])
-        vector = emb_response[0].values  # embedding vector for this chunk
-        # Store the chunk and its vector in the index
-        DOCUMENT_INDEX.append({"text": chunk, "vector": vector})
-    return f"Ingested document with {len(chunks)} sections."
+    # Split the document text into token-bounded chunks (one per paragraph; long paragraphs are windowed)
+    count = _ingest_chunks(iter_chunks([doc_text]))
+    return f"Ingested document with {count} sections."
+
+def ingest_file(path: str) -> str:
+    """Ingest a document from disk, streaming it so large filings never sit in memory whole."""
+    count = _ingest_chunks(iter_chunks(path))
+    return f"Ingested {os.path.basename(path)} with {count} sections."
 
 import math
 
 def cosine_similarity(vec1, vec2):
     # Helper to compute cosine similarity between two vectors
+    # (reference implementation; retrieval goes through DOCUMENT_INDEX.search)
     dot = sum(a*b for a, b in zip(vec1, vec2))
     norm1 = math.sqrt(sum(a*a for a in vec1))
     norm2 = math.sqrt(sum(b*b for b in vec2))
     return dot / (norm1 * norm2)
 
+def search_documents_top_k(query: str, k: int = 3) -> list:
+    """Return the k most relevant chunks as (score, text) pairs, best first."""
+    if not DOCUMENT_INDEX:
+        return []
+    # Embed the query and score it against every chunk with one matrix-vector product
+    query_emb = embedding_model.get_embeddings([query])[0].values
+    return DOCUMENT_INDEX.search(query_emb, k=k)
+
 def search_documents(query: str) -> str:
     """Search the ingested documents for relevant content and return the most relevant text chunk."""
     if not DOCUMENT_INDEX:
         return "No documents available to search."
-    # Embed the query
-    query_emb = embedding_model.get_embeddings([query])[0].values
-    # Find the best match in DOCUMENT_INDEX
-    best_text = ""
-    best_score = -1.0
-    for entry in DOCUMENT_INDEX:
-        score = cosine_similarity(query_emb, entry["vector"])
-        if score > best_score:
-            best_score = score
-            best_text = entry["text"]
-    # You could also return multiple top chunks; here we return the top one.
-    return best_text
+    results = search_documents_top_k(query, k=1)
+    # Use search_documents_top_k to get multiple chunks; the tool returns the top one.
+    return results[0][1] if results else ""
 
 from google.adk import Agent
 
@@ -83,7 +141,9 @@ Section 9: Termination. Either party may terminate this Agreement by giving thir
 Section 10: Governing Law. This Agreement shall be governed by the laws of the State of California..."""
 
 # Ingest the document (agent can also do this via tool invocation, here we call directly for setup)
-ingest_document(contract_text)
+# A persisted index already holds it, so skip re-embedding on restart.
+if not DOCUMENT_INDEX:
+    ingest_document(contract_text)
 
 # Set up an in-memory session and runner for the agent
 session_service = InMemorySessionService()
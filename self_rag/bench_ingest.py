@@ -0,0 +1,116 @@
+"""Compare per-chunk and batched embedding during ingestion.
+
+Uses a local fake embedding model that sleeps to simulate the Vertex AI round
+trip, so no credentials are needed:
+
+    python self_rag/bench_ingest.py --chunks 400 --latency 0.05
+
+With --file, streams a document from disk through the chunker instead and
+reports peak Python memory, which should stay flat as the file grows:
+
+    python self_rag/bench_ingest.py --file big_filing.txt --latency 0
+"""
+import argparse
+import hashlib
+import os
+import time
+import tracemalloc
+
+import numpy as np
+
+from chunker import iter_chunks
+from embedding import EmbeddingReport, embed_in_batches
+from vector_index import VectorIndex
+
+
+class FakeEmbedding:
+    def __init__(self, values):
+        self.values = values
+
+
+class FakeEmbeddingModel:
+    """Stand-in for TextEmbeddingModel with a fixed per-request latency."""
+
+    def __init__(self, dim: int = 768, latency: float = 0.05, per_text_latency: float = 0.0005):
+        self.dim = dim
+        self.latency = latency
+        self.per_text_latency = per_text_latency
+        self.calls = 0
+
+    def get_embeddings(self, texts):
+        self.calls += 1
+        time.sleep(self.latency + self.per_text_latency * len(texts))
+        out = []
+        for text in texts:
+            seed = int.from_bytes(hashlib.sha256(text.encode()).digest()[:4], "little")
+            out.append(FakeEmbedding(np.random.default_rng(seed).standard_normal(self.dim).tolist()))
+        return out
+
+
+def make_chunks(n: int):
+    return [f"Section {i}: The parties agree to clause {i} under the terms herein. " * 5 for i in range(n)]
+
+
+def ingest_per_chunk(model, chunks):
+    index = VectorIndex()
+    for chunk in chunks:
+        index.add(chunk, model.get_embeddings([chunk])[0].values)
+    return index
+
+
+def ingest_batched(model, chunks, batch_size, in_flight, report):
+    index = VectorIndex()
+    for batch, vectors in embed_in_batches(model, chunks, max_batch_size=batch_size,
+                                           max_in_flight=in_flight, report=report):
+        index.add_many(batch, vectors)
+    return index
+
+
+def stream_file(args):
+    model = FakeEmbeddingModel(dim=8, latency=args.latency, per_text_latency=0)
+    count = 0
+    tracemalloc.start()
+    start = time.perf_counter()
+    for batch, _ in embed_in_batches(model, iter_chunks(args.file), max_batch_size=args.batch_size,
+                                     max_in_flight=args.in_flight):
+        count += len(batch)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    size_mb = os.path.getsize(args.file) / 2**20
+    print(f"{size_mb:.1f} MB -> {count} chunks in {elapsed:.2f}s, peak Python memory {peak / 2**20:.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=400)
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated seconds per request")
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--in-flight", type=int, default=4)
+    parser.add_argument("--file", help="stream this file through the chunker instead")
+    args = parser.parse_args()
+
+    if args.file:
+        stream_file(args)
+        return
+
+    chunks = make_chunks(args.chunks)
+
+    model = FakeEmbeddingModel(latency=args.latency)
+    start = time.perf_counter()
+    ingest_per_chunk(model, chunks)
+    sequential = time.perf_counter() - start
+    print(f"per-chunk: {sequential:.2f}s, {model.calls} requests")
+
+    model = FakeEmbeddingModel(latency=args.latency)
+    report = EmbeddingReport()
+    start = time.perf_counter()
+    index = ingest_batched(model, chunks, args.batch_size, args.in_flight, report)
+    batched = time.perf_counter() - start
+    assert len(index) == len(chunks)
+    print(f"batched:   {batched:.2f}s, {model.calls} requests, speedup {sequential / batched:.1f}x")
+    print("per-batch latency:", {k: round(v, 4) for k, v in report.summary().items()})
+
+
+if __name__ == "__main__":
+    main()
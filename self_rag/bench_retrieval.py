@@ -0,0 +1,72 @@
+"""Recall-vs-latency benchmark of the IVF backend against exact search.
+
+Builds a synthetic, clustered corpus of unit vectors (embeddings of real
+contracts cluster by clause type in much the same way), then reports
+recall@k and mean query latency for exact search and for IVF at several
+nprobe settings:
+
+    python self_rag/bench_retrieval.py --size 1000000 --dim 256
+"""
+import argparse
+import time
+
+import numpy as np
+
+from ivf_index import IVFIndex
+from vector_index import VectorIndex
+
+
+def make_corpus(size: int, dim: int, clusters: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, size)
+    vectors = centers[labels] + 1.0 * rng.standard_normal((size, dim)).astype(np.float32)
+    return vectors
+
+
+def timed_search(index, queries, k, **kwargs):
+    results = []
+    start = time.perf_counter()
+    for q in queries:
+        results.append([text for _, text in index.search(q, k, **kwargs)])
+    return results, (time.perf_counter() - start) / len(queries) * 1000
+
+
+def recall(found, truth):
+    hits = sum(len(set(f) & set(t)) for f, t in zip(found, truth))
+    return hits / sum(len(t) for t in truth)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=200_000)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--clusters", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    vectors = make_corpus(args.size, args.dim, args.clusters)
+    texts = [str(i) for i in range(args.size)]
+    rng = np.random.default_rng(1)
+    queries = vectors[rng.integers(0, args.size, args.queries)]
+    queries = queries + 0.3 * rng.standard_normal(queries.shape).astype(np.float32)
+
+    exact = VectorIndex()
+    exact.add_many(texts, vectors)
+    truth, exact_ms = timed_search(exact, queries, args.k)
+
+    start = time.perf_counter()
+    ivf = IVFIndex(min_train_size=1)
+    ivf.add_many(texts, vectors)
+    print(f"corpus {args.size} x {args.dim}, IVF build {time.perf_counter() - start:.1f}s "
+          f"({len(ivf._lists)} lists)")
+    print(f"{'backend':<16}{'recall@' + str(args.k):>10}{'ms/query':>10}")
+    print(f"{'exact':<16}{1.0:>10.3f}{exact_ms:>10.2f}")
+    for nprobe in (1, 2, 4, 8, 16, 32, 64):
+        found, ms = timed_search(ivf, queries, args.k, nprobe=nprobe)
+        print(f"{'ivf nprobe=' + str(nprobe):<16}{recall(found, truth):>10.3f}{ms:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import os
+import re
+
+try:
+    from .embedding import estimate_tokens
+except ImportError:
+    from embedding import estimate_tokens
+
+# text-embedding-005 accepts up to 2048 input tokens; smaller chunks retrieve more precisely
+MAX_CHUNK_TOKENS = 512
+OVERLAP_TOKENS = 64
+READ_BLOCK_SIZE = 1 << 16
+
+# A blank line (paragraph break) or a run of non-whitespace (a word)
+_TOKEN_RE = re.compile(r"\n[^\S\n]*\n\s*|\S+")
+
+
+def _iter_blocks(source, block_size: int = READ_BLOCK_SIZE):
+    """Yield text blocks from a file path or an iterable of strings."""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "r", encoding="utf-8") as f:
+            while True:
+                block = f.read(block_size)
+                if not block:
+                    return
+                yield block
+    else:
+        yield from source
+
+
+def _iter_tokens(blocks):
+    """Yield words and paragraph breaks ("\\n\\n") without joining the blocks.
+
+    A match touching the end of a block may continue in the next one, so it
+    is carried over instead of emitted.
+    """
+    carry = ""
+    for block in blocks:
+        text = carry + block
+        consumed = 0
+        for m in _TOKEN_RE.finditer(text):
+            if m.end() == len(text):
+                break
+            yield "\n\n" if m.group()[0] == "\n" else m.group()
+            consumed = m.end()
+        carry = text[consumed:]
+    for m in _TOKEN_RE.finditer(carry):
+        yield "\n\n" if m.group()[0] == "\n" else m.group()
+
+
+def iter_chunks(source, max_tokens: int = MAX_CHUNK_TOKENS, overlap_tokens: int = OVERLAP_TOKENS):
+    """Stream chunks of at most `max_tokens` (estimated) from a file path or iterable of text.
+
+    Each paragraph becomes one chunk; paragraphs over the budget are split
+    into windows that repeat the last `overlap_tokens` of the previous one.
+    Only the current window is held in memory.
+    """
+    if overlap_tokens >= max_tokens:
+        raise ValueError("overlap_tokens must be smaller than max_tokens.")
+    words, tokens = [], 0
+    for token in _iter_tokens(_iter_blocks(source)):
+        if token == "\n\n":
+            if words:
+                yield " ".join(words)
+            words, tokens = [], 0
+            continue
+        cost = estimate_tokens(token)
+        if words and tokens + cost > max_tokens:
+            yield " ".join(words)
+            # Start the next window with the tail of this one
+            tail, tail_tokens = [], 0
+            for word in reversed(words):
+                word_tokens = estimate_tokens(word)
+                if tail_tokens + word_tokens > overlap_tokens:
+                    break
+                tail.append(word)
+                tail_tokens += word_tokens
+            words, tokens = tail[::-1], tail_tokens
+        words.append(token)
+        tokens += cost
+    if words:
+        yield " ".join(words)
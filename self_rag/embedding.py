@@ -0,0 +1,100 @@
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+# Vertex AI text-embedding-005 accepts at most 250 texts and 20k tokens per request.
+# https://cloud.google.com/vertex-ai/generative-ai/docs/embeddings/get-text-embeddings
+MAX_BATCH_SIZE = 250
+MAX_BATCH_TOKENS = 15000  # stay under the request limit since token counts are estimated
+MAX_IN_FLIGHT = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English prose)."""
+    return len(text) // 4 + 1
+
+
+def iter_batches(texts, max_batch_size: int = MAX_BATCH_SIZE, max_batch_tokens: int = MAX_BATCH_TOKENS):
+    """Group texts into batches bounded by item count and estimated tokens.
+
+    Consumes `texts` lazily, so it can be fed from a generator.
+    """
+    batch, batch_tokens = [], 0
+    for text in texts:
+        tokens = estimate_tokens(text)
+        if batch and (len(batch) >= max_batch_size or batch_tokens + tokens > max_batch_tokens):
+            yield batch
+            batch, batch_tokens = [], 0
+        batch.append(text)
+        batch_tokens += tokens
+    if batch:
+        yield batch
+
+
+@dataclass
+class BatchTiming:
+    index: int
+    size: int
+    seconds: float
+
+
+@dataclass
+class EmbeddingReport:
+    """Per-batch latency of one embed_in_batches run."""
+    batches: list = field(default_factory=list)
+
+    @property
+    def total_texts(self) -> int:
+        return sum(b.size for b in self.batches)
+
+    def summary(self) -> dict:
+        latencies = sorted(b.seconds for b in self.batches)
+        if not latencies:
+            return {"batches": 0, "texts": 0}
+        return {
+            "batches": len(latencies),
+            "texts": self.total_texts,
+            "mean_s": sum(latencies) / len(latencies),
+            "p50_s": latencies[len(latencies) // 2],
+            "max_s": latencies[-1],
+        }
+
+
+def _embed_batch(model, index, batch):
+    start = time.perf_counter()
+    response = model.get_embeddings(batch)
+    elapsed = time.perf_counter() - start
+    return [e.values for e in response], BatchTiming(index, len(batch), elapsed)
+
+
+def embed_in_batches(
+    model,
+    texts,
+    max_batch_size: int = MAX_BATCH_SIZE,
+    max_batch_tokens: int = MAX_BATCH_TOKENS,
+    max_in_flight: int = MAX_IN_FLIGHT,
+    report: EmbeddingReport = None,
+):
+    """Embed texts with `model.get_embeddings`, yielding (texts, vectors) per batch in input order.
+
+    At most `max_in_flight` requests are outstanding at once; timings are
+    appended to `report` as batches complete.
+    """
+    batches = iter_batches(texts, max_batch_size, max_batch_tokens)
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        for index, batch in enumerate(batches):
+            if len(pending) >= max_in_flight:
+                yield _collect(pending.popleft(), report)
+            pending.append((batch, executor.submit(_embed_batch, model, index, batch)))
+        while pending:
+            yield _collect(pending.popleft(), report)
+
+
+def _collect(entry, report):
+    batch, future = entry
+    vectors, timing = future.result()
+    if report is not None:
+        report.batches.append(timing)
+    return batch, vectors
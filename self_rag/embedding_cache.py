@@ -0,0 +1,105 @@
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+class CachedEmbedding:
+    """Mirrors the `.values` attribute of Vertex AI TextEmbedding."""
+
+    def __init__(self, values):
+        self.values = values
+
+
+def content_key(model_name: str, text: str) -> str:
+    """Hash of the model name and the whitespace-normalized text."""
+    normalized = " ".join(text.split())
+    return hashlib.sha256(f"{model_name}\0{normalized}".encode("utf-8")).hexdigest()
+
+
+class CachedEmbeddingModel:
+    """Content-hash embedding cache in front of `model.get_embeddings`.
+
+    Lookups go to an in-memory LRU first, then to an optional SQLite file;
+    only the remaining texts are sent to the wrapped model, in one call.
+    Safe to share between the threads used by embed_in_batches.
+    """
+
+    def __init__(self, model, model_name: str, max_entries: int = 50_000, disk_path: str = None):
+        self.model = model
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if disk_path:
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB)")
+            self._db.commit()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+            "entries": len(self._memory),
+        }
+
+    def _remember(self, key, values):
+        self._memory[key] = values
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _lookup(self, key):
+        values = self._memory.get(key)
+        if values is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return values
+        if self._db is not None:
+            row = self._db.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                values = np.frombuffer(row[0], dtype=np.float32).tolist()
+                self._remember(key, values)
+                self.disk_hits += 1
+                return values
+        return None
+
+    def get_embeddings(self, texts):
+        keys = [content_key(self.model_name, t) for t in texts]
+        found = {}
+        missing = {}  # key -> text; duplicates within the call are embedded once
+        with self._lock:
+            for key, text in zip(keys, texts):
+                if key in found or key in missing:
+                    continue
+                values = self._lookup(key)
+                if values is None:
+                    missing[key] = text
+                    self.misses += 1
+                else:
+                    found[key] = values
+
+        if missing:
+            response = self.model.get_embeddings(list(missing.values()))
+            fresh = dict(zip(missing, (e.values for e in response)))
+            with self._lock:
+                for key, values in fresh.items():
+                    self._remember(key, values)
+                if self._db is not None:
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                        [(k, np.asarray(v, dtype=np.float32).tobytes()) for k, v in fresh.items()],
+                    )
+                    self._db.commit()
+            found.update(fresh)
+
+        return [CachedEmbedding(found[key]) for key in keys]
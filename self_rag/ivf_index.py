@@ -0,0 +1,142 @@
+import numpy as np
+
+try:
+    from .vector_index import RetrievalBackend, VectorIndex, top_k_indices
+except ImportError:
+    from vector_index import RetrievalBackend, VectorIndex, top_k_indices
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32, copy=False)
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray, block: int = 65536) -> np.ndarray:
+    """Nearest (highest cosine) centroid of every vector, computed in blocks."""
+    out = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), block):
+        out[start : start + block] = np.argmax(vectors[start : start + block] @ centroids.T, axis=1)
+    return out
+
+
+def spherical_kmeans(vectors: np.ndarray, k: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """Cluster unit vectors by cosine similarity and return k unit centroids."""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), size=k, replace=False)].copy()
+    for _ in range(iterations):
+        labels = _assign(vectors, centroids)
+        counts = np.bincount(labels, minlength=k)
+        # Sum each cluster's members with one sorted reduceat instead of np.add.at
+        order = np.argsort(labels, kind="stable")
+        sums = np.zeros_like(centroids)
+        present = np.flatnonzero(counts)
+        starts = np.r_[0, np.cumsum(counts[present])[:-1]]
+        sums[present] = np.add.reduceat(vectors[order], starts, axis=0)
+        # Re-seed empty clusters from random points so every list stays usable
+        empty = counts == 0
+        if empty.any():
+            sums[empty] = vectors[rng.choice(len(vectors), size=int(empty.sum()))]
+        centroids = _normalize(sums)
+    return centroids
+
+
+class _InvertedList:
+    """Growable array of the global ids assigned to one cluster."""
+
+    def __init__(self):
+        self.ids = np.empty(16, dtype=np.int64)
+        self.size = 0
+
+    def extend(self, ids: np.ndarray):
+        needed = self.size + len(ids)
+        if needed > len(self.ids):
+            self.ids = np.resize(self.ids, max(needed, 2 * len(self.ids)))
+        self.ids[self.size : needed] = ids
+        self.size = needed
+
+
+class IVFIndex(RetrievalBackend):
+    """Approximate index: inverted file over spherical k-means clusters.
+
+    A query is compared against `nlist` centroids and only the vectors in
+    the `nprobe` closest clusters are scanned, so search cost grows with
+    n * nprobe / nlist instead of n. Until `min_train_size` chunks have been
+    added it answers with an exact scan; after that the clusters are trained
+    and retrained whenever the corpus has grown `retrain_factor` times.
+    Vectors are stored once; the lists only hold row ids.
+    """
+
+    def __init__(self, nlist: int = None, nprobe: int = 8, min_train_size: int = 4096,
+                 retrain_factor: float = 4.0, max_train_sample: int = 100_000, seed: int = 0):
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.min_train_size = min_train_size
+        self.retrain_factor = retrain_factor
+        self.max_train_sample = max_train_sample
+        self.seed = seed
+        self._exact = VectorIndex()  # holds every vector; used before training and to retrain
+        self._centroids = None
+        self._lists = []
+        self._trained_size = 0
+
+    def __len__(self):
+        return len(self._exact)
+
+    @property
+    def is_trained(self) -> bool:
+        return self._centroids is not None
+
+    def add_many(self, texts, vectors) -> None:
+        start = len(self._exact)
+        self._exact.add_many(texts, vectors)
+        n = len(self._exact)
+        if n == start:
+            return
+        if not self.is_trained:
+            if n >= self.min_train_size:
+                self.train()
+        elif n >= self._trained_size * self.retrain_factor:
+            self.train()
+        else:
+            self._add_to_lists(self._exact.vectors[start:], np.arange(start, n))
+
+    def train(self) -> None:
+        """(Re)build the clusters and inverted lists from every stored vector."""
+        vectors = self._exact.vectors
+        n = len(vectors)
+        nlist = self.nlist or max(1, int(np.sqrt(n)))
+        nlist = min(nlist, n)
+        rng = np.random.default_rng(self.seed)
+        sample_size = min(n, max(self.max_train_sample, nlist))
+        sample = vectors[rng.choice(n, size=sample_size, replace=False)] if sample_size < n else vectors
+        self._centroids = spherical_kmeans(sample, nlist, seed=self.seed)
+        self._lists = [_InvertedList() for _ in range(nlist)]
+        self._add_to_lists(vectors, np.arange(n))
+        self._trained_size = n
+
+    def _add_to_lists(self, vectors: np.ndarray, ids: np.ndarray):
+        labels = _assign(vectors, self._centroids)
+        order = np.argsort(labels, kind="stable")
+        labels, ids = labels[order], ids[order]
+        bounds = np.flatnonzero(np.diff(labels)) + 1
+        for lo, hi in zip(np.r_[0, bounds], np.r_[bounds, len(labels)]):
+            self._lists[labels[lo]].extend(ids[lo:hi])
+
+    def search(self, query_vector, k: int = 1, nprobe: int = None) -> list:
+        if not self.is_trained:
+            return self._exact.search(query_vector, k)
+        if len(self) == 0 or k <= 0:
+            return []
+        q = np.asarray(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(q)
+        if norm:
+            q = q / norm
+        nprobe = min(nprobe or self.nprobe, len(self._lists))
+        probe = top_k_indices(self._centroids @ q, nprobe)
+        ids = np.concatenate([self._lists[c].ids[: self._lists[c].size] for c in probe])
+        if not len(ids):
+            return []
+        scores = self._exact.vectors[ids] @ q
+        texts = self._exact.texts
+        return [(float(scores[i]), texts[ids[i]]) for i in top_k_indices(scores, k)]
@@ -0,0 +1,194 @@
+import json
+import mmap
+import os
+
+import numpy as np
+
+try:
+    from .vector_index import RetrievalBackend, VectorIndex, top_k_indices
+except ImportError:
+    from vector_index import RetrievalBackend, VectorIndex, top_k_indices
+
+META_FILE = "meta.json"
+VECTORS_FILE = "vectors.f32"  # row-major float32, one normalized vector per chunk
+OFFSETS_FILE = "offsets.u64"  # uint64 end offset of each chunk's text in TEXTS_FILE
+TEXTS_FILE = "texts.bin"      # UTF-8 chunk texts, concatenated
+
+
+class MmapVectorIndex(RetrievalBackend):
+    """On-disk vector index that is memory-mapped instead of loaded.
+
+    Layout of the index directory:
+        meta.json    {"dim": ..., "count": ...} -- the commit point for appends
+        vectors.f32  normalized float32 vectors
+        offsets.u64  end offset of every text in texts.bin
+        texts.bin    concatenated UTF-8 chunk texts
+
+    Opening only reads meta.json; vectors and texts are paged in by the OS
+    as searches touch them. Appends write to the end of each file and then
+    bump the count in meta.json, so readers never see a half-written chunk.
+    Only one process should append at a time; any number may read and will
+    pick up new chunks on their next search.
+    """
+
+    def __init__(self, path: str, dim: int = None):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.dim = dim
+        self._count = 0
+        self._meta_stamp = None
+        self._vectors = None
+        self._offsets = None
+        self._texts = None
+        self.refresh()
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def __len__(self):
+        self._refresh_if_changed()
+        return self._count
+
+    def refresh(self) -> None:
+        """Re-read meta.json and drop stale mappings."""
+        meta_path = self._file(META_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            self.dim = meta["dim"]
+            self._count = meta["count"]
+            self._meta_stamp = self._stamp(os.stat(meta_path))
+        self._close_maps()
+
+    @staticmethod
+    def _stamp(st):
+        # meta.json is replaced on every commit, so a new inode also signals a change
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _refresh_if_changed(self):
+        meta_path = self._file(META_FILE)
+        try:
+            stamp = self._stamp(os.stat(meta_path))
+        except FileNotFoundError:
+            return
+        if stamp != self._meta_stamp:
+            self.refresh()
+
+    def _close_maps(self):
+        self._vectors = None
+        self._offsets = None
+        if self._texts is not None:
+            self._texts.close()
+            self._texts = None
+
+    def _map(self):
+        # Map only the committed prefix of each file
+        if self._vectors is None and self._count:
+            self._vectors = np.memmap(self._file(VECTORS_FILE), dtype=np.float32, mode="r",
+                                      shape=(self._count, self.dim))
+            self._offsets = np.memmap(self._file(OFFSETS_FILE), dtype=np.uint64, mode="r",
+                                      shape=(self._count,))
+            with open(self._file(TEXTS_FILE), "rb") as f:
+                if int(self._offsets[-1]):
+                    self._texts = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """Memory-mapped view of the stored vectors, shape (n, dim)."""
+        self._refresh_if_changed()
+        self._map()
+        if self._vectors is None:
+            return np.empty((0, self.dim or 0), dtype=np.float32)
+        return self._vectors
+
+    def text(self, i: int) -> str:
+        self._map()
+        start = int(self._offsets[i - 1]) if i else 0
+        end = int(self._offsets[i])
+        if start == end:
+            return ""
+        return self._texts[start:end].decode("utf-8")
+
+    def _write_meta(self, count):
+        tmp = self._file(META_FILE + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"dim": self.dim, "count": count}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self._file(META_FILE))
+
+    def _committed_text_bytes(self):
+        if not self._count:
+            return 0
+        with open(self._file(OFFSETS_FILE), "rb") as f:
+            f.seek((self._count - 1) * 8)
+            return int(np.frombuffer(f.read(8), dtype=np.uint64)[0])
+
+    def _truncate_uncommitted(self, text_bytes):
+        # Drop bytes left behind by an append that crashed before its commit
+        sizes = {
+            VECTORS_FILE: self._count * self.dim * 4,
+            OFFSETS_FILE: self._count * 8,
+            TEXTS_FILE: text_bytes,
+        }
+        for name, size in sizes.items():
+            path = self._file(name)
+            if not os.path.exists(path):
+                open(path, "wb").close()
+            elif os.path.getsize(path) > size:
+                os.truncate(path, size)
+
+    def add_many(self, texts, vectors) -> None:
+        """Append chunks and embeddings to the end of the on-disk files."""
+        texts = list(texts)
+        if not texts:
+            return
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim != 2 or matrix.shape[0] != len(texts):
+            raise ValueError("Expected one vector per text.")
+        self.refresh()
+        if self.dim is None:
+            self.dim = matrix.shape[1]
+        elif matrix.shape[1] != self.dim:
+            raise ValueError(f"Expected vectors of dimension {self.dim}, got {matrix.shape[1]}.")
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        matrix = np.ascontiguousarray(matrix / norms, dtype=np.float32)
+
+        encoded = [t.encode("utf-8") for t in texts]
+        base = self._committed_text_bytes()
+        self._truncate_uncommitted(base)
+        ends = base + np.cumsum([len(b) for b in encoded], dtype=np.uint64)
+
+        with open(self._file(VECTORS_FILE), "ab") as f:
+            f.write(matrix.tobytes())
+        with open(self._file(TEXTS_FILE), "ab") as f:
+            f.write(b"".join(encoded))
+        with open(self._file(OFFSETS_FILE), "ab") as f:
+            f.write(ends.astype(np.uint64).tobytes())
+        self._write_meta(self._count + len(texts))
+        self.refresh()
+
+    def scores(self, query_vector) -> np.ndarray:
+        """Cosine similarity of the query against every stored vector."""
+        q = np.asarray(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(q)
+        if norm:
+            q = q / norm
+        return self.vectors @ q
+
+    def search(self, query_vector, k: int = 1) -> list:
+        """Return the top-k (score, text) pairs, best first."""
+        n = len(self)
+        if n == 0 or k <= 0:
+            return []
+        scores = self.scores(query_vector)
+        return [(float(scores[i]), self.text(int(i))) for i in top_k_indices(scores, k)]
+
+    @classmethod
+    def from_index(cls, index: VectorIndex, path: str) -> "MmapVectorIndex":
+        """Write an in-memory VectorIndex out to `path`."""
+        store = cls(path, dim=index.dim)
+        store.add_many(index.texts, index.vectors)
+        return store
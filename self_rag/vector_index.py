@@ -0,0 +1,122 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+
+class RetrievalBackend(ABC):
+    """Interface shared by the search_documents index implementations."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def add(self, text: str, vector) -> None:
+        """Append a single chunk and its embedding."""
+        self.add_many([text], [vector])
+
+    @abstractmethod
+    def add_many(self, texts, vectors) -> None:
+        """Append chunks and their embeddings."""
+
+    @abstractmethod
+    def search(self, query_vector, k: int = 1) -> list:
+        """Return the top-k (score, text) pairs, best first."""
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first."""
+    n = len(scores)
+    k = min(k, n)
+    if k < n:
+        # argpartition is O(n); only the k winners get fully sorted
+        top = np.argpartition(-scores, k - 1)[:k]
+    else:
+        top = np.arange(n)
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+class VectorIndex(RetrievalBackend):
+    """In-memory vector index backed by a contiguous float32 matrix.
+
+    Vectors are L2-normalized on insert, so cosine similarity against a query
+    is a single matrix-vector product over the filled rows. This exact scan
+    is the reference the approximate backends are measured against.
+    """
+
+    def __init__(self, dim: int = None, initial_capacity: int = 1024):
+        self.dim = dim
+        self._capacity = initial_capacity
+        self._vectors = None  # allocated lazily once the dimension is known
+        self._texts = []
+
+    def __len__(self):
+        return len(self._texts)
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """View of the stored (normalized) vectors, shape (n, dim)."""
+        if self._vectors is None:
+            return np.empty((0, self.dim or 0), dtype=np.float32)
+        return self._vectors[: len(self._texts)]
+
+    @property
+    def texts(self) -> list:
+        return self._texts
+
+    def _reserve(self, extra: int):
+        # Grow geometrically so a stream of appends stays amortized O(1)
+        needed = len(self._texts) + extra
+        if self._vectors is None:
+            self._capacity = max(self._capacity, needed)
+            self._vectors = np.empty((self._capacity, self.dim), dtype=np.float32)
+        elif needed > self._capacity:
+            while self._capacity < needed:
+                self._capacity *= 2
+            grown = np.empty((self._capacity, self.dim), dtype=np.float32)
+            grown[: len(self._texts)] = self._vectors[: len(self._texts)]
+            self._vectors = grown
+
+    def add_many(self, texts, vectors) -> None:
+        """Append several chunks and their embeddings in one copy."""
+        texts = list(texts)
+        if not texts:
+            return
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim != 2 or matrix.shape[0] != len(texts):
+            raise ValueError("Expected one vector per text.")
+        if self.dim is None:
+            self.dim = matrix.shape[1]
+        elif matrix.shape[1] != self.dim:
+            raise ValueError(f"Expected vectors of dimension {self.dim}, got {matrix.shape[1]}.")
+
+        self._reserve(len(texts))
+        start = len(self._texts)
+        rows = self._vectors[start : start + len(texts)]
+        rows[:] = matrix
+        norms = np.linalg.norm(rows, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        rows /= norms
+        self._texts.extend(texts)
+
+    def scores(self, query_vector) -> np.ndarray:
+        """Cosine similarity of the query against every stored vector."""
+        q = np.asarray(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(q)
+        if norm:
+            q = q / norm
+        return self.vectors @ q
+
+    def search(self, query_vector, k: int = 1) -> list:
+        """Return the top-k (score, text) pairs, best first."""
+        n = len(self._texts)
+        if n == 0 or k <= 0:
+            return []
+        scores = self.scores(query_vector)
+        return [(float(scores[i]), self._texts[i]) for i in top_k_indices(scores, k)]
+
+    def clear(self) -> None:
+        self._texts = []
+        self._vectors = None
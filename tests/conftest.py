@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Import self_rag's modules directly, as its bench scripts do; importing the
+# package would load agent.py, which needs Vertex AI credentials
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "self_rag"))
@@ -0,0 +1,126 @@
+"""Tests for batched embedding, against a local fake embedding model (no Vertex AI).
+
+    python -m pytest tests
+"""
+import threading
+import time
+
+from embedding import EmbeddingReport, embed_in_batches, estimate_tokens, iter_batches
+
+
+class FakeEmbedding:
+    def __init__(self, values):
+        self.values = values
+
+
+class FakeEmbeddingModel:
+    """Stand-in for TextEmbeddingModel that records batch sizes and outstanding requests.
+
+    Each text embeds to [len(text), first character code], so a vector can be
+    matched back to its text.
+    """
+
+    def __init__(self, latency: float = 0.01):
+        self.latency = latency
+        self.batches = []
+        self.in_flight = 0
+        self.max_in_flight_seen = 0
+        self._lock = threading.Lock()
+
+    def get_embeddings(self, texts):
+        with self._lock:
+            self.batches.append(list(texts))
+            self.in_flight += 1
+            self.max_in_flight_seen = max(self.max_in_flight_seen, self.in_flight)
+        try:
+            # Later batches answer faster, so completion order differs from input order
+            time.sleep(self.latency / len(self.batches))
+            return [FakeEmbedding([float(len(t)), float(ord(t[0]))]) for t in texts]
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def make_texts(n: int):
+    return [f"{chr(ord('a') + i % 26)} chunk {i} " + "word " * (i % 7) for i in range(n)]
+
+
+def test_iter_batches_respects_size_and_token_bounds():
+    texts = make_texts(103)
+    batches = list(iter_batches(texts, max_batch_size=10, max_batch_tokens=40))
+    assert [t for batch in batches for t in batch] == texts
+    for batch in batches:
+        assert 1 <= len(batch) <= 10
+        assert sum(estimate_tokens(t) for t in batch) <= 40
+
+
+def test_iter_batches_fills_batches_up_to_the_count():
+    batches = list(iter_batches(["x"] * 25, max_batch_size=10, max_batch_tokens=1000))
+    assert [len(b) for b in batches] == [10, 10, 5]
+
+
+def test_iter_batches_oversized_text_goes_alone():
+    big = "y" * 400  # 101 estimated tokens, over the 50-token budget
+    batches = list(iter_batches(["a", big, "b"], max_batch_size=10, max_batch_tokens=50))
+    assert batches == [["a"], [big], ["b"]]
+
+
+def test_iter_batches_consumes_lazily():
+    consumed = []
+
+    def texts():
+        for i in range(10):
+            consumed.append(i)
+            yield f"text {i}"
+
+    first = next(iter_batches(texts(), max_batch_size=3, max_batch_tokens=1000))
+    assert first == ["text 0", "text 1", "text 2"]
+    assert consumed == [0, 1, 2, 3]  # the fourth text closed the first batch
+
+
+def test_iter_batches_empty():
+    assert list(iter_batches([])) == []
+
+
+def test_embed_in_batches_preserves_order():
+    texts = make_texts(57)
+    model = FakeEmbeddingModel()
+    results = list(embed_in_batches(model, texts, max_batch_size=8, max_batch_tokens=1000, max_in_flight=4))
+    assert [t for batch, _ in results for t in batch] == texts
+    for batch, vectors in results:
+        assert vectors == [[float(len(t)), float(ord(t[0]))] for t in batch]
+    assert [batch for batch, _ in results] == sorted(model.batches, key=lambda b: texts.index(b[0]))
+
+
+def test_embed_in_batches_bounds_outstanding_requests():
+    model = FakeEmbeddingModel(latency=0.05)
+    texts = make_texts(60)
+    list(embed_in_batches(model, texts, max_batch_size=5, max_batch_tokens=1000, max_in_flight=3))
+    assert len(model.batches) == 12
+    assert model.max_in_flight_seen == 3
+
+
+def test_embed_in_batches_single_in_flight_is_sequential():
+    model = FakeEmbeddingModel()
+    list(embed_in_batches(model, make_texts(20), max_batch_size=4, max_batch_tokens=1000, max_in_flight=1))
+    assert model.max_in_flight_seen == 1
+
+
+def test_embed_in_batches_report():
+    texts = make_texts(23)
+    report = EmbeddingReport()
+    list(embed_in_batches(FakeEmbeddingModel(), texts, max_batch_size=5, max_batch_tokens=1000,
+                          max_in_flight=2, report=report))
+    assert [b.index for b in report.batches] == [0, 1, 2, 3, 4]
+    assert [b.size for b in report.batches] == [5, 5, 5, 5, 3]
+    assert report.total_texts == 23
+    assert all(b.seconds > 0 for b in report.batches)
+    summary = report.summary()
+    assert summary["batches"] == 5
+    assert summary["texts"] == 23
+    assert 0 < summary["mean_s"] <= summary["max_s"]
+    assert summary["p50_s"] <= summary["max_s"]
+
+
+def test_empty_report_summary():
+    assert EmbeddingReport().summary() == {"batches": 0, "texts": 0}
@@ -1,18 +1,45 @@
+import functools
 import os
 from dotenv import load_dotenv
 load_dotenv()
 
-# Initialize Vertex AI SDK
-import vertexai
-# from vertexai.language_models import TextGenerationModel # Commented out or delete as we are using Gemini
-from vertexai.generative_models import GenerativeModel # Using GenerativeModel class for Gemini models
-vertexai.init(project=os.environ["GOOGLE_CLOUD_PROJECT"], location=os.environ["GOOGLE_CLOUD_LOCATION"])
+# The Vertex AI SDK is initialized on first use, not at import time, so importing this
+# module has no side effects: vertexai.init() sets process-wide project/location config
+# and needs GOOGLE_CLOUD_PROJECT/LOCATION, and the agent may never need it (e.g. when the
+# cache answers, or on a cold start that only serves health checks). ADK already imports
+# vertexai itself, so deferring the import saves no time.
+@functools.lru_cache(maxsize=None)
+def _init_vertexai() -> None:
+    import vertexai
+    vertexai.init(project=os.environ["GOOGLE_CLOUD_PROJECT"], location=os.environ["GOOGLE_CLOUD_LOCATION"])
+
+# GenerativeModel clients are reusable; build one per model ID, on first use, and share it
+@functools.lru_cache(maxsize=None)
+def get_generative_model(model_id: str):
+    _init_vertexai()
+    from vertexai.generative_models import GenerativeModel # Using GenerativeModel class for Gemini models
+    return GenerativeModel(model_id)
+
+def _response_text(response) -> str:
+    """Extract text from a Gemini response or stream chunk."""
+    # Attempt to access response.candidates[0].content.parts[0].text, then .text
+    try:
+        if response.candidates:
+            candidate = response.candidates[0]
+            if candidate.content and candidate.content.parts:
+                return candidate.content.parts[0].text
+            return "" # e.g. a final stream chunk that only carries finish metadata
+        elif hasattr(response, 'text'): # For simple text responses
+            return response.text
+        else: # Unexpected response structure
+            return str(response) # Safely convert to string
+    except (AttributeError, ValueError): # If the response object doesn't have the expected attributes
+        return str(response)
 
 # Change to the successfully tested Gemini model ID
 MODEL_NAME = "gemini-2.0-flash-lite-001"
 # classifier_model = TextGenerationModel.from_pretrained(MODEL_NAME) # Previous code
-# Change classifier_model initialization to use GenerativeModel for Gemini
-classifier_model = GenerativeModel(MODEL_NAME)
+# The classifier model is get_generative_model(MODEL_NAME), created on the first classification
 
 # Define and register ADK BaseLlm derived class
 from google.adk.models import BaseLlm
@@ -48,65 +75,72 @@ class VertexAIGemini(BaseLlm):
         else:
             content_input = str(llm_request)      # Fallback: try direct string conversion
 
-        # Use GenerativeModel from Vertex AI SDK
-        gemini_model_instance = GenerativeModel(self.model) # Use model ID from constructor
+        # Reuse the cached client for this model ID instead of building one per call
+        gemini_model_instance = get_generative_model(self.model)
 
-        # Note: stream=True (streaming) processing is not fully implemented here.
-        # Further implementation might be needed depending on how ADK's BaseLlm expects streaming.
         if stream:
-            # Streaming example (compatibility with ADK BaseLlm and detailed implementation needed)
-            # responses = gemini_model_instance.generate_content(content_input, stream=True)
-            # for response_chunk in responses:
-            #     output_text_chunk = getattr(response_chunk, "text", "")
-            #     if output_text_chunk:
-            #         output_content_chunk = genai_types.Content(role="assistant", parts=[genai_types.Part(text=output_text_chunk)])
-            #         yield output_content_chunk
-            # return # End here if streaming
-            print("Streaming not fully implemented in this example for VertexAIGemini.")
-            # Temporarily act like non-streaming
-            pass
-
-
-        response = gemini_model_instance.generate_content(content_input)
-
-        # Extract text from the response (may vary based on Gemini model's response structure)
-        # Attempt to access .text directly, or parse from response.candidates[0].content.parts[0].text
-        # Defaulting to .text for common cases
-        output_text = ""
-        try:
-            if response.candidates and response.candidates[0].content and response.candidates[0].content.parts:
-                 output_text = response.candidates[0].content.parts[0].text
-            elif hasattr(response, 'text'): # For simple text responses
-                output_text = response.text
-            else: # Unexpected response structure
-                output_text = str(response) # Safely convert to string
-        except AttributeError: # If the response object doesn't have the expected attributes
-             output_text = str(response)
-
-
-        output_content = genai_types.Content(role="assistant", parts=[genai_types.Part(text=output_text)])
+            # Forward each chunk as soon as the SDK's async stream produces it
+            responses = await gemini_model_instance.generate_content_async(content_input, stream=True)
+            async for response_chunk in responses:
+                output_text_chunk = _response_text(response_chunk)
+                if output_text_chunk:
+                    yield genai_types.Content(role="assistant", parts=[genai_types.Part(text=output_text_chunk)])
+            return
+
+        # Async SDK call, so the event loop keeps serving other requests during the round trip
+        response = await gemini_model_instance.generate_content_async(content_input)
+        output_content = genai_types.Content(role="assistant", parts=[genai_types.Part(text=_response_text(response))])
         yield output_content
 
 # Register the new Gemini LLM class with the registry
 LLMRegistry.register(VertexAIGemini)
 
-# Check if registered model patterns are recognized correctly (example output)
-# Changed candidates list from Bison models to Gemini model ID
-print("ADK registered model list check (Gemini Test):")
-gemini_candidates = [MODEL_NAME, "gemini-1.5-pro-latest", "gemini-1.0-pro-001"] # Example Gemini IDs
-for model_id in gemini_candidates:
-    try:
-        # When an LlmAgent is created with a model argument, LLMRegistry calls resolve.
-        # This doesn't fetch the LLM instance directly here but can check pattern matching.
-        llm_instance = LLMRegistry.resolve(model_id) # This attempts to create an instance
-        print(f"✔ {model_id} (Resolved to: {llm_instance.__class__.__name__})")
-    except ValueError as e:
-        print(f"✘ {model_id} (Error: {e})")
-
+def check_model_registry():
+    """Diagnostic: print which class LLMRegistry resolves for some Gemini model IDs."""
+    # Changed candidates list from Bison models to Gemini model ID
+    print("ADK registered model list check (Gemini Test):")
+    gemini_candidates = [MODEL_NAME, "gemini-1.5-pro-latest", "gemini-1.0-pro-001"] # Example Gemini IDs
+    for model_id in gemini_candidates:
+        try:
+            # When an LlmAgent is created with a model argument, LLMRegistry calls resolve.
+            # This doesn't fetch the LLM instance directly here but can check pattern matching.
+            llm_instance = LLMRegistry.resolve(model_id) # This attempts to create an instance
+            print(f"✔ {model_id} (Resolved to: {llm_instance.__class__.__name__})")
+        except ValueError as e:
+            print(f"✘ {model_id} (Error: {e})")
+
+
+# Import the classification cache and truncation helpers (support both package and script contexts)
+try:
+    from .classification_cache import ClassificationCache
+    from .truncation import truncate_document
+except ImportError:
+    from classification_cache import ClassificationCache
+    from truncation import truncate_document
+
+# Only part of a long document goes into the prompt; the category is usually clear early on.
+# CLASSIFY_MAX_INPUT_TOKENS: estimated token cap for the document text (0 = no cap)
+# CLASSIFY_TRUNCATION: head, head_tail or sampled (see truncation.py)
+CLASSIFY_MAX_INPUT_TOKENS = int(os.getenv("CLASSIFY_MAX_INPUT_TOKENS", "2000"))
+CLASSIFY_TRUNCATION = os.getenv("CLASSIFY_TRUNCATION", "sampled")
+
+# Exact and near-duplicate documents (re-uploads, filled-in templates) reuse an earlier category.
+# CLASSIFICATION_CACHE_THRESHOLD: minimum estimated Jaccard similarity for a near match (1 = exact only)
+# CLASSIFICATION_CACHE_PATH: optional SQLite file that keeps the cache across restarts
+classification_cache = ClassificationCache(
+    MODEL_NAME,
+    threshold=float(os.getenv("CLASSIFICATION_CACHE_THRESHOLD", "0.9")),
+    max_entries=int(os.getenv("CLASSIFICATION_CACHE_SIZE", "50000")),
+    disk_path=os.getenv("CLASSIFICATION_CACHE_PATH")
+)
 
-# Tool function for document classification
-def classify_document(text: str) -> str:
-    """Classifies the uploaded document content and returns the category name."""
+async def _classify_with_model(text: str, truncation: str = None, max_input_tokens: int = None) -> str:
+    """Classify one document with a Gemini call (no cache)."""
+    text = truncate_document(
+        text,
+        CLASSIFY_MAX_INPUT_TOKENS if max_input_tokens is None else max_input_tokens,
+        truncation or CLASSIFY_TRUNCATION
+    )
     prompt = f"Classify the following document into a single broad category:\n\"\"\"\n{text}\n\"\"\"\nCategory:"
     # Use generate_content instead of classifier_model.predict and modify response handling
     # response = classifier_model.predict(prompt, max_output_tokens=5, temperature=0.0) # Previous code
@@ -116,7 +150,7 @@ def classify_document(text: str) -> str:
         max_output_tokens=10, # Set short as it's a category name
         temperature=0.0
     )
-    response = classifier_model.generate_content(prompt, generation_config=generation_config)
+    response = await get_generative_model(MODEL_NAME).generate_content_async(prompt, generation_config=generation_config)
 
     category = ""
     try:
@@ -131,6 +165,11 @@ def classify_document(text: str) -> str:
 
     return category
 
+# Tool function for document classification
+async def classify_document(text: str) -> str:
+    """Classifies the uploaded document content and returns the category name."""
+    return await classification_cache.classify(text, _classify_with_model)
+
 # Define LLM agent (using the changed MODEL_NAME)
 from google.adk.agents import LlmAgent
 document_agent = LlmAgent(
@@ -148,6 +187,7 @@ root_agent = document_agent
 
 # Agent execution example (InMemory session and Runner setup)
 if __name__ == "__main__":
+    check_model_registry()
     from google.adk.sessions import InMemorySessionService
     from google.adk.runners import Runner
     # from google.genai import types  # Already aliased as genai_types
@@ -0,0 +1,314 @@
+"""Bulk document classification with resumable, streamed output.
+
+Reads documents from JSONL (one object per line) or CSV, classifies them
+with a bounded number of model calls in flight, and appends one JSON line
+per document to the output file as soon as it is classified:
+
+    python vertex_ai_classification/batch_classify.py docs.jsonl results.jsonl \\
+        --concurrency 16 --pack-size 8
+
+The output file doubles as the checkpoint: rerunning the same command
+skips every document that already has a category in it.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import re
+import time
+from dataclasses import dataclass, field
+
+# Import the classifier (support both package and script contexts)
+try:
+    from .agent import MODEL_NAME, classification_cache, get_generative_model, _classify_with_model, _response_text
+except ImportError:
+    from agent import MODEL_NAME, classification_cache, get_generative_model, _classify_with_model, _response_text
+
+DEFAULT_CONCURRENCY = 8
+# Documents up to this many characters may share a prompt when packing is on
+DEFAULT_PACK_MAX_CHARS = 2000
+DEFAULT_MAX_RETRIES = 3
+
+_PACKED_LINE_RE = re.compile(r"^\s*(\d+)\s*[:.)\-]\s*(.+?)\s*$")
+
+
+def iter_documents(path: str, id_field: str = "id", text_field: str = "text"):
+    """Yield (doc_id, text) from a .jsonl or .csv file; the line number is the id if none is given."""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.lower().endswith(".csv"):
+            rows = csv.DictReader(f)
+        else:
+            rows = (json.loads(line) for line in f if line.strip())
+        for i, row in enumerate(rows):
+            yield str(row.get(id_field, i)), row[text_field]
+
+
+def load_checkpoint(output_path: str) -> set:
+    """Ids already classified in `output_path`.
+
+    A line cut off by an interrupted run is truncated away so the file
+    stays valid JSONL when new results are appended.
+    """
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, "rb+") as f:
+        valid_end = 0
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                break
+            valid_end += len(line)
+            if "category" in record:
+                done.add(record["id"])
+        f.truncate(valid_end)
+    return done
+
+
+@dataclass
+class ClassificationReport:
+    """Counters and timing of one classify_file run."""
+    skipped: int = 0
+    classified: int = 0
+    errors: int = 0
+    model_calls: int = 0
+    packed_calls: int = 0
+    unpacked_fallbacks: int = 0
+    started_at: float = field(default_factory=time.perf_counter)
+    elapsed: float = 0.0
+
+    def summary(self) -> dict:
+        elapsed = self.elapsed or (time.perf_counter() - self.started_at)
+        return {
+            "classified": self.classified,
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "model_calls": self.model_calls,
+            "packed_calls": self.packed_calls,
+            "unpacked_fallbacks": self.unpacked_fallbacks,
+            "elapsed_s": round(elapsed, 2),
+            "docs_per_s": round(self.classified / elapsed, 1) if elapsed else 0.0,
+        }
+
+
+def _packed_prompt(texts: list) -> str:
+    documents = "\n".join(f"Document {i}:\n\"\"\"\n{text}\n\"\"\"" for i, text in enumerate(texts, 1))
+    return (
+        "Classify each of the following documents into a single broad category.\n"
+        f"{documents}\n"
+        f"Answer with exactly {len(texts)} lines in the form '<document number>: <category>'."
+    )
+
+
+def _parse_packed(answer: str, n: int):
+    """Categories in document order, or None unless every document got exactly one."""
+    categories = {}
+    for line in answer.splitlines():
+        match = _PACKED_LINE_RE.match(line)
+        if match:
+            categories.setdefault(int(match.group(1)), match.group(2))
+    if sorted(categories) != list(range(1, n + 1)):
+        return None
+    return [categories[i] for i in range(1, n + 1)]
+
+
+async def classify_packed(texts: list) -> list:
+    """Classify several short documents with one model call; None if the answer can't be matched up."""
+    from vertexai.generative_models import GenerationConfig
+    generation_config = GenerationConfig(
+        max_output_tokens=12 * len(texts), # one short category line per document
+        temperature=0.0
+    )
+    response = await get_generative_model(MODEL_NAME).generate_content_async(
+        _packed_prompt(texts), generation_config=generation_config
+    )
+    return _parse_packed(_response_text(response), len(texts))
+
+
+async def _with_retries(call, max_retries: int):
+    for attempt in range(max_retries + 1):
+        try:
+            return await call()
+        except Exception:
+            if attempt == max_retries:
+                raise
+            await asyncio.sleep(2 ** attempt)
+
+
+def _iter_groups(documents, pack_size: int, pack_max_chars: int):
+    """Group short documents up to pack_size per prompt; long ones go alone."""
+    pending = []
+    for doc in documents:
+        if pack_size <= 1 or len(doc[1]) > pack_max_chars:
+            yield [doc]
+            continue
+        pending.append(doc)
+        if len(pending) >= pack_size:
+            yield pending
+            pending = []
+    if pending:
+        yield pending
+
+
+async def classify_file(
+    input_path: str,
+    output_path: str,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    pack_size: int = 1,
+    pack_max_chars: int = DEFAULT_PACK_MAX_CHARS,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    id_field: str = "id",
+    text_field: str = "text",
+    report_every: float = 10.0,
+    report: ClassificationReport = None,
+) -> ClassificationReport:
+    """Classify every document in `input_path` not yet in `output_path`, appending results.
+
+    At most `concurrency` model calls are in flight and only a few groups
+    are read ahead, so memory stays flat however large the input is.
+    Documents that still fail after `max_retries` get an "error" line and
+    are retried on the next run.
+    """
+    report = report or ClassificationReport()
+    done = load_checkpoint(output_path)
+    queue = asyncio.Queue(maxsize=concurrency * 2)
+
+    def remaining():
+        for doc_id, text in iter_documents(input_path, id_field, text_field):
+            if doc_id in done:
+                report.skipped += 1
+            else:
+                yield doc_id, text
+
+    with open(output_path, "a", encoding="utf-8") as out:
+        def write(record: dict):
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+
+        async def call_model(text: str) -> str:
+            report.model_calls += 1
+            return await _classify_with_model(text)
+
+        async def classify_one(doc_id: str, text: str, fingerprint: tuple = None):
+            try:
+                if fingerprint is None:
+                    # Exact and near-duplicate documents are answered by the cache
+                    category = await _with_retries(
+                        lambda: classification_cache.classify(text, call_model), max_retries
+                    )
+                else:
+                    # Already looked up and missed while packing
+                    category = await _with_retries(lambda: call_model(text), max_retries)
+                    if category:
+                        classification_cache.store(text, category, fingerprint)
+            except Exception as e:
+                report.errors += 1
+                write({"id": doc_id, "error": str(e)})
+                return
+            report.classified += 1
+            write({"id": doc_id, "category": category})
+
+        async def classify_group(group: list):
+            misses = []
+            for doc_id, text in group:
+                fingerprint = classification_cache.fingerprint(text)
+                category = classification_cache.lookup(text, fingerprint)
+                if category is None:
+                    misses.append((doc_id, text, fingerprint))
+                else:
+                    report.classified += 1
+                    write({"id": doc_id, "category": category})
+            categories = None
+            if len(misses) > 1:
+                report.model_calls += 1
+                report.packed_calls += 1
+                try:
+                    categories = await _with_retries(
+                        lambda: classify_packed([text for _, text, _ in misses]), max_retries
+                    )
+                except Exception:
+                    categories = None
+                if categories is None:
+                    report.unpacked_fallbacks += 1
+            if categories is None:
+                for doc_id, text, fingerprint in misses:
+                    await classify_one(doc_id, text, fingerprint)
+                return
+            for (doc_id, text, fingerprint), category in zip(misses, categories):
+                classification_cache.store(text, category, fingerprint)
+                report.classified += 1
+                write({"id": doc_id, "category": category})
+
+        async def worker():
+            while True:
+                group = await queue.get()
+                try:
+                    if group is None:
+                        return
+                    if len(group) > 1:
+                        await classify_group(group)
+                    else:
+                        await classify_one(*group[0])
+                finally:
+                    queue.task_done()
+
+        async def progress():
+            while True:
+                await asyncio.sleep(report_every)
+                print("progress:", report.summary(), flush=True)
+
+        async def produce():
+            for group in _iter_groups(remaining(), pack_size, pack_max_chars):
+                await queue.put(group)
+            for _ in range(max(1, concurrency)):
+                await queue.put(None)
+
+        tasks = [asyncio.create_task(produce())]
+        tasks += [asyncio.create_task(worker()) for _ in range(max(1, concurrency))]
+        reporter = asyncio.create_task(progress()) if report_every else None
+        try:
+            # A failing worker (e.g. a write error) stops the run instead of stalling the producer
+            await asyncio.gather(*tasks)
+        finally:
+            pending = tasks + ([reporter] if reporter else [])
+            for task in pending:
+                task.cancel()
+            # Let cancelled workers unwind before the output file closes
+            await asyncio.gather(*pending, return_exceptions=True)
+            report.elapsed = time.perf_counter() - report.started_at
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", help="documents as .jsonl or .csv")
+    parser.add_argument("output", help="results as .jsonl; also the resume checkpoint")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="model calls in flight")
+    parser.add_argument("--pack-size", type=int, default=1, help="short documents per prompt (1 disables packing)")
+    parser.add_argument("--pack-max-chars", type=int, default=DEFAULT_PACK_MAX_CHARS)
+    parser.add_argument("--max-retries", type=int, default=DEFAULT_MAX_RETRIES)
+    parser.add_argument("--id-field", default="id")
+    parser.add_argument("--text-field", default="text")
+    parser.add_argument("--report-every", type=float, default=10.0, help="seconds between progress lines (0 disables)")
+    args = parser.parse_args()
+
+    report = asyncio.run(classify_file(
+        args.input, args.output,
+        concurrency=args.concurrency,
+        pack_size=args.pack_size,
+        pack_max_chars=args.pack_max_chars,
+        max_retries=args.max_retries,
+        id_field=args.id_field,
+        text_field=args.text_field,
+        report_every=args.report_every,
+    ))
+    print("done:", report.summary())
+    print("cache:", classification_cache.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Throughput and resume check for batch_classify against a fake Gemini backend.
+
+Classifies a synthetic JSONL corpus one call at a time, with bounded
+concurrency, and with prompt packing. Then it interrupts a run halfway,
+resumes it, and checks that every document ends up classified exactly
+once:
+
+    python vertex_ai_classification/bench_batch.py --docs 2000 --latency 0.2
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import tempfile
+import time
+
+import vertexai.generative_models as generative_models
+
+from bench_generate import FakeGenerativeModel, fake_response
+
+import agent
+import batch_classify
+
+CATEGORIES = ["Finance", "Legal", "Medical", "Technology", "Sports"]
+
+
+class FakeClassifier(FakeGenerativeModel):
+    """Answers single and packed classification prompts after `latency` seconds."""
+    calls = 0
+
+    async def generate_content_async(self, contents, *, stream: bool = False, **kwargs):
+        FakeClassifier.calls += 1
+        await asyncio.sleep(self._client() + self.latency)
+        numbers = re.findall(r"^Document (\d+):", contents, re.M)
+        if numbers:
+            return fake_response("\n".join(f"{n}: {CATEGORIES[int(n) % len(CATEGORIES)]}" for n in numbers))
+        return fake_response(CATEGORIES[len(contents) % len(CATEGORIES)])
+
+
+def write_corpus(path: str, n: int):
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(n):
+            f.write(json.dumps({"id": f"doc-{i}", "text": f"Quarterly report {i} " * (5 + i % 40)}) + "\n")
+
+
+def run(input_path, output_path, **kwargs):
+    FakeClassifier.calls = 0
+    agent.classification_cache.clear()
+    start = time.perf_counter()
+    report = asyncio.run(batch_classify.classify_file(input_path, output_path, report_every=0, **kwargs))
+    return report, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.2, help="fake round trip in seconds")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--pack-size", type=int, default=8)
+    args = parser.parse_args()
+
+    FakeClassifier.latency = args.latency
+    generative_models.GenerativeModel = FakeClassifier
+    agent.get_generative_model.cache_clear()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = os.path.join(tmp, "docs.jsonl")
+        write_corpus(corpus, args.docs)
+        # Sequential classification is too slow to run in full; time a sample and extrapolate
+        sample = os.path.join(tmp, "sample.jsonl")
+        write_corpus(sample, 20)
+        _, seconds = run(sample, os.path.join(tmp, "sequential.jsonl"), concurrency=1)
+        print(f"{'mode':<24}{'docs/s':>8}{'model calls':>13}{'wall s':>9}")
+        print(f"{'sequential':<24}{20 / seconds:>8.1f}{args.docs:>13}{seconds / 20 * args.docs:>9.1f} (extrapolated)")
+        modes = (
+            (f"concurrency {args.concurrency}", {"concurrency": args.concurrency}),
+            (f"  + pack size {args.pack_size}", {"concurrency": args.concurrency, "pack_size": args.pack_size}),
+        )
+        for label, kwargs in modes:
+            report, seconds = run(corpus, os.path.join(tmp, f"{len(kwargs)}.jsonl"), **kwargs)
+            print(f"{label:<24}{report.classified / seconds:>8.1f}{FakeClassifier.calls:>13}{seconds:>9.1f}")
+
+        # Interrupt a run halfway through, leave a torn last line, then resume
+        output = os.path.join(tmp, "resumed.jsonl")
+
+        async def interrupted():
+            task = asyncio.create_task(batch_classify.classify_file(
+                corpus, output, concurrency=args.concurrency, report_every=0))
+            while not os.path.exists(output) or os.path.getsize(output) < 1 or \
+                    sum(1 for _ in open(output)) < args.docs // 2:
+                await asyncio.sleep(0.01)
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+        asyncio.run(interrupted())
+        with open(output, "a", encoding="utf-8") as f:
+            f.write('{"id": "doc-torn", "categ')
+        before = len(batch_classify.load_checkpoint(output))
+        report, _ = run(corpus, output, concurrency=args.concurrency)
+        with open(output, encoding="utf-8") as f:
+            ids = [json.loads(line)["id"] for line in f]
+        assert len(ids) == len(set(ids)) == args.docs, (len(ids), len(set(ids)))
+        print(f"resume: {before} done before interrupt, {report.skipped} skipped, "
+              f"{report.classified} classified after resume, {len(ids)} unique results")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Model calls saved by the classification cache on a corpus full of duplicates.
+
+The synthetic corpus mixes re-uploads (same text, different case and
+whitespace), filled-in templates (a few words changed) and unique
+documents. A fake classifier derives the true category from a hidden
+marker, so every cached answer can be checked:
+
+    python vertex_ai_classification/bench_cache.py --docs 20000
+"""
+import argparse
+import asyncio
+import os
+import random
+import re
+import tempfile
+import time
+
+from classification_cache import ClassificationCache
+
+CATEGORIES = ["Finance", "Legal", "Medical", "Technology", "Sports"]
+_MARKER_RE = re.compile(r"(?:tmpl|uniq)(\d+)", re.I)
+
+
+def true_category(text: str) -> str:
+    return CATEGORIES[int(_MARKER_RE.search(text).group(1)) % len(CATEGORIES)]
+
+
+def make_corpus(n: int, templates: int = 200, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    vocabulary = [f"w{i}" for i in range(5000)]
+    bodies = [[f"tmpl{t}"] + rng.choices(vocabulary, k=150) for t in range(templates)]
+    corpus = []
+    for i in range(n):
+        roll = rng.random()
+        if corpus and roll < 0.35:
+            # Re-upload of an earlier document with different case/spacing
+            text = rng.choice(corpus)
+            corpus.append("  ".join(text.upper().split()) if rng.random() < 0.5 else text + "\n")
+        elif roll < 0.75:
+            # Filled-in template: a handful of words differ (names, dates, amounts)
+            words = list(rng.choice(bodies))
+            for _ in range(rng.randint(1, 4)):
+                words[rng.randrange(1, len(words))] = rng.choice(vocabulary)
+            corpus.append(" ".join(words))
+        else:
+            corpus.append(" ".join([f"uniq{i}"] + rng.choices(vocabulary, k=150)))
+    return corpus
+
+
+async def replay(cache: ClassificationCache, corpus: list):
+    calls = 0
+
+    async def fake_model(text: str) -> str:
+        nonlocal calls
+        calls += 1
+        return true_category(text)
+
+    wrong = 0
+    start = time.perf_counter()
+    for text in corpus:
+        if await cache.classify(text, fake_model) != true_category(text):
+            wrong += 1
+    elapsed = time.perf_counter() - start
+    return calls, wrong, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--max-entries", type=int, default=50000)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.docs)
+    print(f"{args.docs} documents; without a cache every one is a model call")
+    print(f"{'threshold':<11}{'model calls':>12}{'exact':>8}{'near':>8}{'hit rate':>10}{'wrong':>7}{'us/doc':>8}")
+    for threshold in (1.0, 0.9, 0.8):
+        cache = ClassificationCache("fake-model", threshold=threshold, max_entries=args.max_entries)
+        calls, wrong, elapsed = asyncio.run(replay(cache, corpus))
+        s = cache.stats()
+        print(f"{threshold:<11}{calls:>12}{s['exact_hits']:>8}{s['near_hits']:>8}{s['hit_rate']:>10.2f}"
+              f"{wrong:>7}{elapsed / len(corpus) * 1e6:>8.0f}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache.db")
+        asyncio.run(replay(ClassificationCache("fake-model", disk_path=path), corpus))
+        restarted = ClassificationCache("fake-model", disk_path=path)
+        calls, wrong, _ = asyncio.run(replay(restarted, corpus))
+        print(f"after restart from disk: {calls} model calls, hit rate {restarted.stats()['hit_rate']:.2f}, {wrong} wrong")
+
+
+if __name__ == "__main__":
+    main()
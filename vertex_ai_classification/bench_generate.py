@@ -0,0 +1,139 @@
+"""Benchmark VertexAIGemini.generate_content_async against a fake Gemini backend.
+
+The fake GenerativeModel mimics the SDK's cost model: the first call on a
+new instance pays for client setup (credentials lookup, gRPC channel),
+then every call takes a fixed round trip. The previous wrapper built a new
+GenerativeModel per call and made the blocking generate_content call on
+the event loop; the current one reuses a cached client and awaits the
+async API:
+
+    python vertex_ai_classification/bench_generate.py --concurrency 32
+"""
+import argparse
+import asyncio
+import os
+import time
+from types import SimpleNamespace
+
+os.environ.setdefault("GOOGLE_CLOUD_PROJECT", "bench-project")
+os.environ.setdefault("GOOGLE_CLOUD_LOCATION", "us-central1")
+
+import vertexai.generative_models as generative_models
+
+import agent
+from agent import VertexAIGemini
+
+
+def fake_response(text: str):
+    part = SimpleNamespace(text=text)
+    return SimpleNamespace(candidates=[SimpleNamespace(content=SimpleNamespace(parts=[part]))])
+
+
+class FakeGenerativeModel:
+    """Stands in for vertexai GenerativeModel with configurable setup and latency."""
+    setup = 0.05
+    latency = 0.2
+    chunks = 5
+    clients_built = 0
+
+    def __init__(self, model_id: str):
+        self.model_id = model_id
+        self._client_ready = False
+
+    def _client(self):
+        if not self._client_ready:
+            FakeGenerativeModel.clients_built += 1
+            self._client_ready = True
+            return self.setup
+        return 0.0
+
+    def generate_content(self, contents, **kwargs):
+        time.sleep(self._client() + self.latency)
+        return fake_response("Finance")
+
+    async def generate_content_async(self, contents, *, stream: bool = False, **kwargs):
+        await asyncio.sleep(self._client())
+        if stream:
+            return self._stream()
+        await asyncio.sleep(self.latency)
+        return fake_response("Finance")
+
+    async def _stream(self):
+        for i in range(self.chunks):
+            await asyncio.sleep(self.latency / self.chunks)
+            yield fake_response(f"part{i} ")
+
+
+async def legacy_generate(model_id: str, prompt: str):
+    """The wrapper as it was: a new model per call and a blocking call on the loop."""
+    response = generative_models.GenerativeModel(model_id).generate_content(prompt)
+    yield agent._response_text(response)
+
+
+async def current_generate(llm: VertexAIGemini, prompt: str, stream: bool = False):
+    async for content in llm.generate_content_async(SimpleNamespace(prompt=prompt), stream=stream):
+        yield content.parts[0].text
+
+
+async def measure(make_call, concurrency: int):
+    """Wall time for `concurrency` parallel calls, plus the worst event-loop stall seen meanwhile."""
+    stalls = []
+    done = asyncio.Event()
+
+    async def heartbeat():
+        while not done.is_set():
+            t = time.perf_counter()
+            await asyncio.sleep(0.005)
+            stalls.append(time.perf_counter() - t - 0.005)
+
+    async def one(i):
+        async for _ in make_call(f"document {i}"):
+            pass
+
+    beat = asyncio.create_task(heartbeat())
+    FakeGenerativeModel.clients_built = 0
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await beat
+    return elapsed, max(stalls, default=0.0), FakeGenerativeModel.clients_built
+
+
+async def first_chunk_latency(llm: VertexAIGemini):
+    start = time.perf_counter()
+    first = None
+    async for _ in current_generate(llm, "document", stream=True):
+        if first is None:
+            first = time.perf_counter() - start
+    return first, time.perf_counter() - start
+
+
+async def bench(args):
+    FakeGenerativeModel.setup = args.setup
+    FakeGenerativeModel.latency = args.latency
+    generative_models.GenerativeModel = FakeGenerativeModel
+    agent.get_generative_model.cache_clear()
+    llm = VertexAIGemini(model=agent.MODEL_NAME)
+
+    print(f"{args.concurrency} concurrent calls, {args.latency * 1000:.0f} ms round trip, "
+          f"{args.setup * 1000:.0f} ms client setup")
+    print(f"{'wrapper':<10}{'wall ms':>9}{'calls/s':>9}{'max loop stall ms':>19}{'clients':>9}")
+    runs = (
+        ("before", lambda p: legacy_generate(agent.MODEL_NAME, p)),
+        ("after", lambda p: current_generate(llm, p)),
+    )
+    for name, make_call in runs:
+        elapsed, stall, clients = await measure(make_call, args.concurrency)
+        print(f"{name:<10}{elapsed * 1000:>9.0f}{args.concurrency / elapsed:>9.1f}{stall * 1000:>19.0f}{clients:>9}")
+
+    first, total = await first_chunk_latency(llm)
+    print(f"stream: first chunk after {first * 1000:.0f} ms, full response after {total * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.2, help="fake round trip in seconds")
+    parser.add_argument("--setup", type=float, default=0.05, help="fake client setup in seconds")
+    asyncio.run(bench(parser.parse_args()))
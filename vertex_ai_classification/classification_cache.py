@@ -0,0 +1,278 @@
+import asyncio
+import hashlib
+import re
+import sqlite3
+import threading
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+_WORD_RE = re.compile(r"\w+")
+_GRAM_MULTIPLIER = np.uint64(0x9E3779B1)
+# Documents longer than this (in characters) are fingerprinted in a worker thread
+_OFFLOAD_CHARS = 100_000
+
+
+def normalize_text(text: str) -> str:
+    """Case- and whitespace-insensitive form used for exact matching."""
+    return " ".join(text.casefold().split())
+
+
+def content_key(model_name: str, text: str) -> str:
+    """Hash of the model name and the normalized text."""
+    return hashlib.sha256(f"{model_name}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+def shingles(text: str, size: int = 3) -> np.ndarray:
+    """Distinct 32-bit hashes of the word n-grams of the normalized text."""
+    words = _WORD_RE.findall(text.casefold())
+    if not words:
+        return np.empty(0, dtype=np.uint64)
+    # Hash each word once (stable across processes), then roll the hashes into n-gram hashes
+    h = np.fromiter((zlib.crc32(w.encode("utf-8")) for w in words), dtype=np.uint64, count=len(words))
+    size = min(size, len(h))
+    grams = h[:len(h) - size + 1].copy()
+    for j in range(1, size):
+        grams = grams * _GRAM_MULTIPLIER + h[j:len(h) - size + 1 + j]
+    return np.unique(grams & np.uint64(0xFFFFFFFF))
+
+
+def sample_shingles(hashed_shingles: np.ndarray, k: int) -> np.ndarray:
+    """The k smallest shingle hashes (all of them if there are fewer).
+
+    The hashes are uniform, so this is a consistent sample: two near-duplicate
+    documents keep mostly the same shingles and their Jaccard estimate holds.
+    """
+    if k <= 0 or len(hashed_shingles) <= k:
+        return hashed_shingles
+    return np.partition(hashed_shingles, k - 1)[:k]
+
+
+class MinHasher:
+    """MinHash signatures whose agreement estimates the Jaccard similarity of shingle sets."""
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        # Fixed seed, so signatures written to disk stay comparable across runs
+        self.a = rng.integers(0, 1 << 63, num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.b = rng.integers(0, 1 << 63, num_perm, dtype=np.uint64)
+        self.num_perm = num_perm
+
+    def signature(self, hashed_shingles: np.ndarray, block: int = 1024) -> np.ndarray:
+        # Multiply-add-shift hashing of the 32-bit shingle hashes (wraps mod 2**64), a block of
+        # shingles at a time with a running minimum, so memory stays at block x num_perm
+        signature = np.full(self.num_perm, np.iinfo(np.uint64).max, dtype=np.uint64)
+        for start in range(0, len(hashed_shingles), block):
+            permuted = (np.outer(hashed_shingles[start:start + block], self.a) + self.b) >> np.uint64(32)
+            np.minimum(signature, permuted.min(axis=0), out=signature)
+        return signature
+
+    @staticmethod
+    def similarity(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+        return float(np.mean(sig_a == sig_b))
+
+
+def lsh_bands(num_perm: int, threshold: float) -> tuple:
+    """(bands, rows) whose LSH collision curve rises well below `threshold`, so true matches are found."""
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        if (1 / bands) ** (1 / rows) <= threshold - 0.1:
+            best = (bands, rows)
+    return best
+
+
+class ClassificationCache:
+    """Category cache for exact and near-duplicate documents.
+
+    - Exact: documents equal after case/whitespace normalization share a
+      SHA-256 key.
+    - Near: MinHash signatures over word 3-grams, bucketed with LSH; a
+      candidate counts when its estimated Jaccard similarity is at least
+      `threshold`. Documents with fewer than `min_shingles` 3-grams are
+      matched exactly only. Long documents are signed from a sample of their
+    `max_shingles` smallest shingle hashes. `threshold >= 1` disables near
+    matching.
+
+    Entries live in an LRU of `max_entries`. With `disk_path` every entry is
+    also written to SQLite: exact lookups fall through to disk, and the most
+    recent `max_entries` rows are loaded into memory (and the near-duplicate
+    index) on first use.
+    """
+
+    def __init__(self, model_name: str, threshold: float = 0.9, max_entries: int = 50_000,
+                 disk_path: str = None, num_perm: int = 128, min_shingles: int = 8,
+                 max_shingles: int = 4096):
+        self.model_name = model_name
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.min_shingles = min_shingles
+        self.max_shingles = max_shingles
+        self.near_enabled = threshold < 1
+        self.hasher = MinHasher(num_perm)
+        self.bands, self.rows = lsh_bands(num_perm, threshold)
+        self._memory = OrderedDict()  # key -> (category, signature or None)
+        self._buckets = [dict() for _ in range(self.bands)]  # band hash -> set of keys
+        self._in_flight = {}  # key -> Future, so concurrent duplicates call the model once
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.disk_path = disk_path
+        self._db = None
+
+    def _open_disk(self):
+        """Open the SQLite tier and warm memory from it; deferred to first use to keep startup cheap."""
+        if self.disk_path is None or self._db is not None:
+            return
+        self._db = sqlite3.connect(self.disk_path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS classifications (key TEXT PRIMARY KEY, category TEXT, signature BLOB)"
+        )
+        self._db.commit()
+        rows = self._db.execute(
+            "SELECT key, category, signature FROM classifications ORDER BY rowid DESC LIMIT ?",
+            (self.max_entries,),
+        ).fetchall()
+        for key, category, blob in reversed(rows):
+            self._remember(key, category, np.frombuffer(blob, dtype=np.uint64) if blob else None)
+
+    def __len__(self):
+        return len(self._memory)
+
+    def clear(self) -> None:
+        """Drop the in-memory entries and counters (the disk tier is kept)."""
+        with self._lock:
+            self._memory.clear()
+            self._buckets = [dict() for _ in range(self.bands)]
+            self.exact_hits = self.near_hits = self.disk_hits = self.misses = 0
+
+    def stats(self) -> dict:
+        hits = self.exact_hits + self.near_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "exact_hits": self.exact_hits,
+            "near_hits": self.near_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "entries": len(self._memory),
+        }
+
+    def _band_keys(self, signature: np.ndarray):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def _remember(self, key: str, category: str, signature):
+        if key in self._memory:
+            self._forget(key)
+        self._memory[key] = (category, signature)
+        if signature is not None:
+            for band, band_key in self._band_keys(signature):
+                self._buckets[band].setdefault(band_key, set()).add(key)
+        while len(self._memory) > self.max_entries:
+            self._forget(next(iter(self._memory)))
+
+    def _forget(self, key: str):
+        _, signature = self._memory.pop(key)
+        if signature is not None:
+            for band, band_key in self._band_keys(signature):
+                bucket = self._buckets[band].get(band_key)
+                if bucket is not None:
+                    bucket.discard(key)
+                    if not bucket:
+                        del self._buckets[band][band_key]
+
+    def fingerprint(self, text: str) -> tuple:
+        """(exact key, MinHash signature or None) for a document."""
+        key = content_key(self.model_name, text)
+        signature = None
+        if self.near_enabled:
+            hashed = shingles(text)
+            if len(hashed) >= self.min_shingles:
+                signature = self.hasher.signature(sample_shingles(hashed, self.max_shingles))
+        return key, signature
+
+    def _near(self, signature: np.ndarray):
+        candidates = set()
+        for band, band_key in self._band_keys(signature):
+            candidates.update(self._buckets[band].get(band_key, ()))
+        best_key, best_similarity = None, self.threshold
+        for key in candidates:
+            similarity = MinHasher.similarity(signature, self._memory[key][1])
+            if similarity >= best_similarity:
+                best_key, best_similarity = key, similarity
+        return best_key
+
+    def lookup(self, text: str, fingerprint: tuple = None):
+        """Cached category for `text` (exact, then disk, then near-duplicate), or None."""
+        key, signature = fingerprint or self.fingerprint(text)
+        with self._lock:
+            self._open_disk()
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.exact_hits += 1
+                return entry[0]
+            if self._db is not None:
+                row = self._db.execute("SELECT category FROM classifications WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self._remember(key, row[0], signature)
+                    self.disk_hits += 1
+                    return row[0]
+            if signature is not None:
+                near_key = self._near(signature)
+                if near_key is not None:
+                    self._memory.move_to_end(near_key)
+                    self.near_hits += 1
+                    return self._memory[near_key][0]
+            self.misses += 1
+            return None
+
+    def store(self, text: str, category: str, fingerprint: tuple = None) -> None:
+        key, signature = fingerprint or self.fingerprint(text)
+        with self._lock:
+            self._open_disk()
+            self._remember(key, category, signature)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO classifications (key, category, signature) VALUES (?, ?, ?)",
+                    (key, category, signature.tobytes() if signature is not None else None),
+                )
+                self._db.commit()
+
+    async def classify(self, text: str, classify):
+        """Cached category for `text`, calling `await classify(text)` only on a miss."""
+        if len(text) > _OFFLOAD_CHARS:
+            fingerprint = await asyncio.to_thread(self.fingerprint, text)
+        else:
+            fingerprint = self.fingerprint(text)
+        category = self.lookup(text, fingerprint)
+        if category is not None:
+            return category
+        key = fingerprint[0]
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            category = await classify(text)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when no duplicate was waiting
+            raise
+        else:
+            if category:
+                self.store(text, category, fingerprint)
+            future.set_result(category)
+        finally:
+            del self._in_flight[key]
+        return category
@@ -0,0 +1,135 @@
+"""Accuracy versus input tokens for each truncation strategy and token cap.
+
+Runs every (strategy, cap) pair over a labeled sample set and reports
+classification accuracy next to the estimated input tokens spent:
+
+    # Offline: synthetic long documents, keyword classifier
+    python vertex_ai_classification/eval_truncation.py
+
+    # Real Gemini calls on your own labeled documents (JSONL/CSV with text and label)
+    python vertex_ai_classification/eval_truncation.py --samples labeled.jsonl --classifier gemini
+
+The synthetic set places the category signal where real documents do:
+mostly up front, sometimes only at the end (signature blocks, closing
+sections), behind a long cover page, or spread thinly through the body.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import random
+
+from truncation import STRATEGIES, estimate_tokens, truncate_document
+
+KEYWORDS = {
+    "Finance": ["revenue", "invoice", "ebitda", "dividend", "ledger", "fiscal"],
+    "Legal": ["plaintiff", "indemnify", "hereinafter", "jurisdiction", "counsel", "statute"],
+    "Medical": ["diagnosis", "patient", "dosage", "clinical", "symptoms", "prescribed"],
+    "Technology": ["kubernetes", "latency", "api", "firmware", "deployment", "encryption"],
+    "Sports": ["tournament", "league", "playoff", "striker", "coach", "championship"],
+}
+FILLER = ("the of and to in is for on with as by at this that from be are was it an or "
+          "which section page report review summary note item date number total period").split()
+
+
+def make_samples(n: int, seed: int = 0) -> list:
+    """Synthetic labeled documents of 1k-60k tokens with the signal placed head/tail/spread/after a cover."""
+    rng = random.Random(seed)
+    samples = []
+    for _ in range(n):
+        label = rng.choice(list(KEYWORDS))
+        words = rng.choices(FILLER, k=rng.randint(800, 45000))
+        signal = [rng.choice(KEYWORDS[label]) for _ in range(12)]
+        placement = rng.choices(["head", "tail", "after_cover", "spread"], weights=[55, 15, 15, 15])[0]
+        if placement == "head":
+            positions = [rng.randrange(0, min(300, len(words))) for _ in signal]
+        elif placement == "tail":
+            positions = [rng.randrange(max(0, len(words) - 300), len(words)) for _ in signal]
+        elif placement == "after_cover":
+            cover = min(len(words) // 2, 3000)
+            positions = [rng.randrange(cover, min(cover + 400, len(words))) for _ in signal]
+        else:
+            positions = [rng.randrange(0, len(words)) for _ in signal]
+        for pos, word in zip(positions, signal):
+            words[pos] = word
+        samples.append({"text": " ".join(words), "label": label, "placement": placement})
+    return samples
+
+
+def load_samples(path: str, text_field: str = "text", label_field: str = "label") -> list:
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.lower().endswith(".csv"):
+            rows = list(csv.DictReader(f))
+        else:
+            rows = [json.loads(line) for line in f if line.strip()]
+    return [{"text": r[text_field], "label": r[label_field]} for r in rows]
+
+
+def keyword_classifier(text: str) -> str:
+    """Offline stand-in for the model: the category whose keywords appear most often."""
+    counts = {label: 0 for label in KEYWORDS}
+    for word in text.split():
+        for label, keywords in KEYWORDS.items():
+            if word in keywords:
+                counts[label] += 1
+    best = max(counts, key=counts.get)
+    return best if counts[best] else "Unknown"
+
+
+def is_correct(predicted: str, label: str) -> bool:
+    return label.casefold() in predicted.casefold()
+
+
+async def evaluate(samples: list, strategy: str, cap: int, classifier: str, concurrency: int) -> dict:
+    prompts = [truncate_document(s["text"], cap, strategy) for s in samples]
+    if classifier == "keyword":
+        predictions = [keyword_classifier(p) for p in prompts]
+    else:
+        from agent import _classify_with_model
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def classify(sample):
+            async with semaphore:
+                return await _classify_with_model(sample["text"], truncation=strategy, max_input_tokens=cap)
+
+        predictions = await asyncio.gather(*(classify(s) for s in samples))
+    correct = [is_correct(p, s["label"]) for p, s in zip(predictions, samples)]
+    tokens = [estimate_tokens(p) for p in prompts]
+    by_placement = {}
+    for sample, ok in zip(samples, correct):
+        if "placement" in sample:
+            hits, total = by_placement.get(sample["placement"], (0, 0))
+            by_placement[sample["placement"]] = (hits + ok, total + 1)
+    return {
+        "accuracy": sum(correct) / len(samples),
+        "tokens": sum(tokens),
+        "by_placement": {k: hits / total for k, (hits, total) in sorted(by_placement.items())},
+    }
+
+
+async def main(args):
+    samples = load_samples(args.samples, args.text_field, args.label_field) if args.samples \
+        else make_samples(args.n)
+    print(f"{len(samples)} documents, {sum(estimate_tokens(s['text']) for s in samples):,} tokens untruncated")
+    print(f"{'strategy':<11}{'cap':>6}{'accuracy':>10}{'tokens':>12}{'vs none':>9}  by placement")
+    baseline = await evaluate(samples, "none", 0, args.classifier, args.concurrency)
+    rows = [("none", 0, baseline)]
+    for strategy in (s for s in STRATEGIES if s != "none"):
+        for cap in args.caps:
+            rows.append((strategy, cap, await evaluate(samples, strategy, cap, args.classifier, args.concurrency)))
+    for strategy, cap, r in rows:
+        placements = " ".join(f"{k}={v:.2f}" for k, v in r["by_placement"].items())
+        print(f"{strategy:<11}{cap or '-':>6}{r['accuracy']:>10.3f}{r['tokens']:>12,}"
+              f"{r['tokens'] / baseline['tokens']:>9.1%}  {placements}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--samples", help="labeled .jsonl or .csv; default is a synthetic set")
+    parser.add_argument("--text-field", default="text")
+    parser.add_argument("--label-field", default="label")
+    parser.add_argument("-n", type=int, default=300, help="synthetic documents")
+    parser.add_argument("--caps", type=int, nargs="+", default=[250, 500, 1000, 2000, 4000])
+    parser.add_argument("--classifier", choices=["keyword", "gemini"], default="keyword")
+    parser.add_argument("--concurrency", type=int, default=8, help="Gemini calls in flight")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,81 @@
+import re
+
+# Rough chars-per-token ratio for English prose with Gemini's tokenizer
+CHARS_PER_TOKEN = 4
+GAP_MARKER = "\n[...]\n"
+
+_WHITESPACE_RE = re.compile(r"\s")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token)."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _cut_head(text: str, max_chars: int) -> str:
+    """First max_chars characters, backed off to the last whitespace so no word is split."""
+    if len(text) <= max_chars:
+        return text
+    cut = text.rfind(" ", 0, max_chars + 1)
+    return text[:cut if cut > max_chars // 2 else max_chars].rstrip()
+
+
+def _cut_tail(text: str, max_chars: int) -> str:
+    if len(text) <= max_chars:
+        return text
+    start = len(text) - max_chars
+    space = text.find(" ", start)
+    return text[space + 1 if 0 <= space < start + max_chars // 2 else start:].lstrip()
+
+
+def head(text: str, max_tokens: int) -> str:
+    """Keep the beginning: title, abstract, first pages."""
+    return _cut_head(text, max_tokens * CHARS_PER_TOKEN)
+
+
+def head_tail(text: str, max_tokens: int, head_share: float = 0.75) -> str:
+    """Keep the beginning and the end (signatures, closing sections), dropping the middle."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    budget = max_chars - len(GAP_MARKER)
+    head_chars = int(budget * head_share)
+    return _cut_head(text, head_chars) + GAP_MARKER + _cut_tail(text, budget - head_chars)
+
+
+def sampled(text: str, max_tokens: int, chunk_tokens: int = 128) -> str:
+    """Keep evenly spaced chunks across the whole document, always including the first one."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    chunk_chars = chunk_tokens * CHARS_PER_TOKEN
+    n_chunks = max(1, (max_chars + len(GAP_MARKER)) // (chunk_chars + len(GAP_MARKER)))
+    if n_chunks == 1:
+        return _cut_head(text, max_chars)
+    stride = (len(text) - chunk_chars) / (n_chunks - 1)
+    chunks = []
+    for i in range(n_chunks):
+        start = int(i * stride)
+        if i:
+            # Start on a word boundary
+            match = _WHITESPACE_RE.search(text, start, start + chunk_chars // 2)
+            start = match.end() if match else start
+        chunks.append(_cut_head(text[start:start + chunk_chars], chunk_chars))
+    return GAP_MARKER.join(chunks)
+
+
+STRATEGIES = {
+    "none": lambda text, max_tokens: text,
+    "head": head,
+    "head_tail": head_tail,
+    "sampled": sampled,
+}
+
+
+def truncate_document(text: str, max_tokens: int, strategy: str = "head_tail") -> str:
+    """Fit `text` into roughly `max_tokens` input tokens with the named strategy."""
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown truncation strategy {strategy!r}; expected one of {sorted(STRATEGIES)}")
+    if max_tokens <= 0 or estimate_tokens(text) <= max_tokens:
+        return text
+    return STRATEGIES[strategy](text, max_tokens)